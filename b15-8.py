@@ -8,6 +8,8 @@ Tetris controls: Z (rotate blocks), X (drop faster)
 Q: Quit the game
 R: Restart the game
 
+B15_SEED=<int> fixes the sequence of Tetris pieces (reproducible run).
+
 Features:
 - Snake grows by eating apples
 - Falling Tetris blocks create obstacles
@@ -17,11 +19,14 @@ Features:
 Fusion by AI Assistant 2025.
 """
 
+import os
 from collections import deque, namedtuple
-from random import randint
+from random import Random, randint
 
 import pyxel
 
+from frame_profiler import FrameProfiler
+
 Point = namedtuple("Point", ["x", "y"])  # Convenience class for coordinates
 
 
@@ -59,6 +64,69 @@ TETRIS_PIECES = [
     [[0,0,1],[1,1,1]]   # L piece
 ]
 
+FULL_ROW = (1 << WIDTH) - 1  # Row bitmask with every cell filled
+BLOCK_DIGITS = str.maketrans("01", f"0{COL_BLOCK:x}")  # Row bits -> Image.set colors
+
+
+def shape_masks(shape):
+    """Row bitmasks of a piece shape (bit x set = column x filled)."""
+    return [sum(1 << col for col, cell in enumerate(row) if cell) for row in shape]
+
+
+def rotate_shape(shape):
+    """The shape rotated 90 degrees clockwise."""
+    rows = len(shape)
+    cols = len(shape[0])
+    rotated = [[0] * rows for _ in range(cols)]
+    for i in range(rows):
+        for j in range(cols):
+            rotated[j][rows - 1 - i] = shape[i][j]
+    return rotated
+
+
+def rotation_states(shape):
+    """(row masks, width) of the four clockwise rotations of a shape."""
+    states = []
+    for _ in range(4):
+        states.append((shape_masks(shape), len(shape[0])))
+        shape = rotate_shape(shape)
+    return states
+
+
+# Rotation states of every piece, computed once: PIECE_ROTATIONS[kind][rotation]
+PIECE_ROTATIONS = [rotation_states(shape) for shape in TETRIS_PIECES]
+
+# Offsets (dx, dy) tried in order when a rotated piece does not fit in place
+# (-3 lets a vertical I piece turn flat against the right wall)
+WALL_KICKS = [(0, 0), (-1, 0), (1, 0), (0, -1), (-2, 0), (2, 0), (-3, 0)]
+
+
+def fits(rows, x, y, width, field):
+    """Check whether piece rows (already shifted to column x) fit at row y."""
+    if x < 0 or x + width > WIDTH or y < HEIGHT_SCORE or y + len(rows) > HEIGHT:
+        return False
+    for i, mask in enumerate(rows):
+        if field[y + i] & mask:
+            return False
+    return True
+
+
+def seven_bag(rng):
+    """Yield piece kinds in shuffled bags holding each of the 7 pieces once."""
+    while True:
+        bag = list(range(len(TETRIS_PIECES)))
+        rng.shuffle(bag)
+        yield from bag
+
+
+def row_cells(mask):
+    """Yield the x of every filled cell of a row bitmask."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 UP    = Point(0, -1)
 DOWN  = Point(0, 1)
 RIGHT = Point(1, 0)
@@ -68,51 +136,59 @@ START = Point(5, 5 + HEIGHT_SCORE)
 
 
 class TetrisPiece:
-    """A falling Tetris piece."""
+    """A falling Tetris piece.
+
+    The piece keeps its shape as row bitmasks already shifted to its column
+    (self.rows), so testing it against the bitboard field is one AND per row.
+    Its rotations come from the precomputed PIECE_ROTATIONS table.
+    """
     
-    def __init__(self):
-        self.shape = TETRIS_PIECES[randint(0, len(TETRIS_PIECES) - 1)]
-        self.x = WIDTH // 2 - len(self.shape[0]) // 2
+    def __init__(self, kind):
+        self.kind = kind
+        self.rotation = 0
+        masks, self.width = PIECE_ROTATIONS[kind][0]
+        self.x = WIDTH // 2 - self.width // 2
         self.y = HEIGHT_SCORE
+        self.rows = [mask << self.x for mask in masks]
         self.drop_timer = 0
         
-    def rotate(self):
-        """Rotate the piece 90 degrees clockwise."""
-        rows = len(self.shape)
-        cols = len(self.shape[0])
-        rotated = [[0] * rows for _ in range(cols)]
-        for i in range(rows):
-            for j in range(cols):
-                rotated[j][rows - 1 - i] = self.shape[i][j]
+    def rotate(self, field):
+        """Rotate the piece 90 degrees clockwise, kicking it off walls and blocks."""
+        rotation = (self.rotation + 1) % 4
+        masks, width = PIECE_ROTATIONS[self.kind][rotation]
+        for dx, dy in WALL_KICKS:
+            x = self.x + dx
+            y = self.y + dy
+            if x < 0:
+                continue
+            rows = [mask << x for mask in masks]
+            if fits(rows, x, y, width, field):
+                self.rotation = rotation
+                self.width = width
+                self.rows = rows
+                self.x = x
+                self.y = y
+                return True
+        return False
         
-        # Check if rotation is valid
-        old_shape = self.shape
-        self.shape = rotated
-        if self.x + len(self.shape[0]) > WIDTH or self.x < 0:
-            self.shape = old_shape
-            return False
-        return True
+    def shifted_rows(self, dx):
+        """Row masks of the piece moved dx columns."""
+        if dx >= 0:
+            return [mask << dx for mask in self.rows]
+        return [mask >> -dx for mask in self.rows]
         
     def can_move(self, dx, dy, field):
         """Check if piece can move to new position."""
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        for row in range(len(self.shape)):
-            for col in range(len(self.shape[0])):
-                if self.shape[row][col]:
-                    px = new_x + col
-                    py = new_y + row
-                    
-                    if px < 0 or px >= WIDTH or py >= HEIGHT:
-                        return False
-                    if py >= HEIGHT_SCORE and field[py][px]:
-                        return False
-        return True
+        if self.x + dx < 0:
+            return False
+        rows = self.shifted_rows(dx) if dx else self.rows
+        return fits(rows, self.x + dx, self.y + dy, self.width, field)
         
     def move(self, dx, dy, field):
         """Move piece if possible."""
         if self.can_move(dx, dy, field):
+            if dx:
+                self.rows = self.shifted_rows(dx)
             self.x += dx
             self.y += dy
             return True
@@ -127,10 +203,17 @@ class TetrisPiece:
 class Snake:
     """The class that sets up and runs the game."""
 
-    def __init__(self):
-        """Initiate pyxel, set up sounds, game variables, and run."""
+    def __init__(self, seed=None):
+        """Initiate pyxel, set up sounds, game variables, and run.
+
+        seed fixes the sequence of Tetris pieces (None: random).
+        """
+        self.seed = seed
         pyxel.init(WIDTH, HEIGHT, fps=2)
         define_sound_and_music()          # Load SFX and music tables
+        # FRAME_PROFILE=1 to enable; CSV only, the window is too small for the overlay
+        self.profiler = FrameProfiler("b15-8")
+        self.field_image = pyxel.Image(WIDTH, HEIGHT)  # placed blocks, color 0 = empty
         self.reset()
         pyxel.playm(0, loop=True)         # Start background music track 0
         pyxel.run(self.update, self.draw)
@@ -143,9 +226,11 @@ class Snake:
         self.score        = 0                    # track apples eaten + lines cleared
         self.popped_point = None                 # for apple logic
         
-        # Tetris field: 2D array for placed blocks
-        self.field = [[0 for _ in range(WIDTH)] for _ in range(HEIGHT)]
+        # Tetris field: one bitmask per row for placed blocks (bit x = column x)
+        self.field = [0] * HEIGHT
+        self.field_image.cls(0)
         self.current_piece = None
+        self.pieces = seven_bag(Random(self.seed))  # next piece kinds
         self.piece_timer = 0
         self.drop_interval = 60  # frames between automatic drops
         
@@ -158,15 +243,22 @@ class Snake:
 
     def update(self):
         """Update logic of game. Moves snake, handles Tetris, checks collisions, handles Q/R."""
+        self.profiler.start()
         if not self.death:
             self.update_direction()
+            self.profiler.lap("direction")
             self.update_snake()
+            self.profiler.lap("snake")
             self.update_tetris()
+            self.profiler.lap("tetris")
             self.check_apple()   # play eat sound
+            self.profiler.lap("apple")
             self.check_death()
+            self.profiler.lap("death")
 
         # Quit or restart always available
         if pyxel.btn(pyxel.KEY_Q):
+            self.profiler.close()
             pyxel.quit()
         if pyxel.btnp(pyxel.KEY_R):
             self.reset()
@@ -194,11 +286,11 @@ class Snake:
         """Handle Tetris piece spawning, movement, and line clearing."""
         # Spawn new piece if none exists
         if self.current_piece is None:
-            self.current_piece = TetrisPiece()
+            self.current_piece = TetrisPiece(next(self.pieces))
             
         # Handle Tetris controls
         if pyxel.btnp(pyxel.KEY_Z):
-            self.current_piece.rotate()
+            self.current_piece.rotate(self.field)
         if pyxel.btn(pyxel.KEY_X):
             self.drop_interval = 3  # Fast drop
         else:
@@ -216,32 +308,33 @@ class Snake:
                 
     def place_piece(self):
         """Place the current piece into the field."""
-        for row in range(len(self.current_piece.shape)):
-            for col in range(len(self.current_piece.shape[0])):
-                if self.current_piece.shape[row][col]:
-                    px = self.current_piece.x + col
-                    py = self.current_piece.y + row
-                    if py >= HEIGHT_SCORE and py < HEIGHT and px < WIDTH:
-                        self.field[py][px] = 1
+        piece = self.current_piece
+        for i, mask in enumerate(piece.rows):
+            py = piece.y + i
+            if HEIGHT_SCORE <= py < HEIGHT:
+                self.field[py] |= mask
+        self.patch_field_image(max(piece.y, HEIGHT_SCORE),
+                               min(piece.y + len(piece.rows), HEIGHT))
                         
     def clear_lines(self):
         """Clear complete lines and award points."""
-        lines_cleared = 0
-        for y in range(HEIGHT - 1, HEIGHT_SCORE - 1, -1):
-            if all(self.field[y][x] for x in range(WIDTH)):
-                # Clear the line
-                for move_y in range(y, HEIGHT_SCORE, -1):
-                    for x in range(WIDTH):
-                        self.field[move_y][x] = self.field[move_y - 1][x]
-                for x in range(WIDTH):
-                    self.field[HEIGHT_SCORE][x] = 0
-                lines_cleared += 1
-                y += 1  # Check same line again
-                
+        rows = self.field[HEIGHT_SCORE:]
+        kept = [row for row in rows if row != FULL_ROW]
+        lines_cleared = len(rows) - len(kept)
         if lines_cleared > 0:
+            # Splice out the full rows and add empty ones on top
+            bottom = HEIGHT_SCORE + len(rows) - 1 - rows[::-1].index(FULL_ROW)
+            self.field[HEIGHT_SCORE:] = [0] * lines_cleared + kept
+            self.patch_field_image(HEIGHT_SCORE, bottom + 1)  # rows that moved
             self.score += lines_cleared * 10
             pyxel.play(0, 0)  # Play sound for line clear
 
+    def patch_field_image(self, top, bottom):
+        """Redraw rows top..bottom-1 of the field image from the bitboard."""
+        self.field_image.set(0, top, [
+            format(self.field[y], f"0{WIDTH}b")[::-1].translate(BLOCK_DIGITS)
+            for y in range(top, bottom)])
+
     def check_apple(self):
         """Check whether the snake has eaten the apple."""
         if self.snake[0] == self.apple:
@@ -257,7 +350,7 @@ class Snake:
             x = randint(0, WIDTH - 1)
             y = randint(HEIGHT_SCORE + 1, HEIGHT - 1)
             p = Point(x, y)
-            if p not in snake_cells and not self.field[y][x]:
+            if p not in snake_cells and not self.field[y] >> x & 1:
                 self.apple = p
                 return
 
@@ -272,7 +365,7 @@ class Snake:
         elif len(self.snake) != len(set(self.snake)):
             self.death_event()
         # Hit a Tetris block?
-        elif head.y < HEIGHT and head.x < WIDTH and self.field[head.y][head.x]:
+        elif head.y < HEIGHT and head.x < WIDTH and self.field[head.y] >> head.x & 1:
             self.death_event()
 
     def death_event(self):
@@ -287,33 +380,33 @@ class Snake:
 
     def draw(self):
         """Draw the game or death screen depending on self.death."""
+        self.profiler.start()
         if not self.death:
             pyxel.cls(col=COL_BACKGROUND)
             self.draw_score()
+            self.profiler.lap("draw_score")
             self.draw_tetris_field()
+            self.profiler.lap("draw_field")
             self.draw_current_piece()
+            self.profiler.lap("draw_piece")
             self.draw_snake()
             pyxel.pset(self.apple.x, self.apple.y, col=COL_APPLE)
+            self.profiler.lap("draw_snake")
         else:
             self.draw_death()
 
     def draw_tetris_field(self):
-        """Draw the placed Tetris blocks."""
-        for y in range(HEIGHT_SCORE, HEIGHT):
-            for x in range(WIDTH):
-                if self.field[y][x]:
-                    pyxel.pset(x, y, col=COL_BLOCK)
+        """Draw the placed Tetris blocks (kept up to date in self.field_image)."""
+        pyxel.blt(0, 0, self.field_image, 0, 0, WIDTH, HEIGHT, 0)
                     
     def draw_current_piece(self):
         """Draw the currently falling Tetris piece."""
         if self.current_piece:
-            for row in range(len(self.current_piece.shape)):
-                for col in range(len(self.current_piece.shape[0])):
-                    if self.current_piece.shape[row][col]:
-                        x = self.current_piece.x + col
-                        y = self.current_piece.y + row
-                        if 0 <= x < WIDTH and y >= HEIGHT_SCORE:
-                            pyxel.pset(x, y, col=COL_FALLING_BLOCK)
+            for i, mask in enumerate(self.current_piece.rows):
+                y = self.current_piece.y + i
+                if y >= HEIGHT_SCORE:
+                    for x in row_cells(mask):
+                        pyxel.pset(x, y, col=COL_FALLING_BLOCK)
 
     def draw_snake(self):
         """Draw the snake with a distinct head color."""
@@ -413,5 +506,7 @@ def define_sound_and_music():
     pyxel.musics[0].set([], [2], [3], [4])
 
 
-# Start the game
-Snake()
\ No newline at end of file
+if __name__ == "__main__":
+    # Start the game (B15_SEED=<int> replays the same piece sequence)
+    seed = os.environ.get("B15_SEED")
+    Snake(seed=int(seed) if seed else None)
@@ -9,6 +9,8 @@
 #
 # Usage:
 #   pyxel run demo.py
+#   DEMO_SEED=42 pyxel run demo.py        (reproducible random run)
+#   DEMO_QUALITY=low pyxel run demo.py    (fixed quality tier: high/medium/low/minimal)
 #
 # Controls:
 #   - Mouse: Move paddle horizontally
@@ -16,6 +18,7 @@
 #
 # Dependencies:
 #   - pyxel (https://github.com/kitao/pyxel)
+#   - numpy (https://numpy.org)
 #
 # License:
 #   MIT License
@@ -23,49 +26,851 @@
 
 import pyxel  # Main Pyxel game engine module
 import math   # For trigonometric functions and mathematical calculations
-import random # For random value generation
+import heapq    # Event scheduler (min-heap of timers)
+import os       # DEMO_SEED / DEMO_QUALITY environment variables
+import time     # Frame time measurement for the quality governor
 from collections import deque  # For efficient queue operations (mouse trail management)
 
-class Particle:
-    """Particle effect class for visual effects
-    Represents explosions, muzzle flashes, and other visual effects"""
+import numpy as np  # Array storage for particles and game entities
+
+from frame_profiler import FrameProfiler  # Opt-in per-phase timings (FRAME_PROFILE=1)
+
+# Type codes stored in the typed entity arrays
+BULLET_PLAYER = 0  # Bullet owner: player
+BULLET_ENEMY  = 1  # Bullet owner: enemy or boss
+ENEMY_NORMAL  = 0  # Straight movement with optional drift
+ENEMY_SINE    = 1  # Sine-wave movement
+ENEMY_SPIRAL  = 2  # Spiral movement
+ENEMY_TYPES   = [ENEMY_NORMAL, ENEMY_SINE, ENEMY_SPIRAL]
+
+# Enemy movement patterns as closed-form functions of the frames t since spawn.
+# They sum the per-frame steps the enemies used to integrate,
+#     y += speed
+#     x += vx                    (normal)
+#     x += 2 * sin(0.1 * y)      (sine)
+#     angle += 0.1               (spiral)
+#     x += 2 * cos(angle)
+# over t frames, using
+# sum(k = 1..t) sin(a + k d) = sin(a + (t + 1) d / 2) sin(t d / 2) / sin(d / 2).
+# Positions depend only on the spawn state and t, so no rounding error builds
+# up over an enemy's life. This costs about three trig calls per enemy instead
+# of one (0.4-0.7 ms per frame at 5,000 enemies, depending on the machine).
+def move_normal(t, x0, y0, speed, vx):
+    """Straight line with horizontal drift vx"""
+    return x0 + vx * t, y0 + speed * t
+
+def move_sine(t, x0, y0, speed, vx):
+    """Horizontal sine wave driven by the height"""
+    a, d = 0.1 * y0, 0.1 * speed
+    return x0 + 2 * np.sin(a + (t + 1) * d / 2) * np.sin(t * d / 2) / np.sin(d / 2), y0 + speed * t
+
+def move_spiral(t, x0, y0, speed, vx):
+    """Horizontal swing from an angle turning 0.1 rad per frame"""
+    return x0 + 2 * np.cos((t + 1) * 0.05) * np.sin(t * 0.05) / math.sin(0.05), y0 + speed * t
+
+ENEMY_PATTERNS = {ENEMY_NORMAL: move_normal, ENEMY_SINE: move_sine, ENEMY_SPIRAL: move_spiral}
+
+# Random events, scheduled ahead with geometrically distributed waiting times
+ENEMY_FIRE_CHANCE   = 1 / 121  # Per enemy per frame
+POWERUP_DROP_CHANCE = 1 / 5    # Per enemy killed
+
+# Field layouts (name -> dtype) of each entity kind
+BULLET_FIELDS    = {'x': np.float64, 'y': np.float64, 'vx': np.float64, 'vy': np.float64,
+                    'owner': np.int8}
+ENEMY_FIELDS     = {'x': np.float64, 'y': np.float64, 'x0': np.float64, 'y0': np.float64,
+                    'spawn': np.int64, 'speed': np.float64, 'vx': np.float64,
+                    'type': np.int8, 'id': np.int64}
+POWERUP_FIELDS   = {'x': np.float64, 'y': np.float64, 'angle': np.float64}
+EXPLOSION_FIELDS = {'x': np.float64, 'y': np.float64, 'life': np.int32, 'radius': np.int32,
+                    'variant': np.int8}
+
+# Explosions grow by one pixel of radius per frame for EXPLOSION_LIFE frames;
+# every radius of EXPLOSION_VARIANTS animations is pre-rendered at startup
+EXPLOSION_LIFE     = 30
+EXPLOSION_VARIANTS = 4
+EXPLOSION_COLORS   = [8, 9, 10]
+
+# Background starfield: stars get a random speed in STAR_SPEED_RANGE and are
+# baked into STAR_BANDS tiling layers, one per speed band
+STAR_COUNT       = 100
+STAR_SPEED_RANGE = (0.5, 3.0)
+STAR_BANDS       = 4
+STAR_COLORS      = [5, 6, 7, 12, 13]
+
+# Mini-map: 1/MINIMAP_SCALE of the playfield at the top right, re-rendered
+# every MINIMAP_REFRESH frames. Above MINIMAP_DENSITY_THRESHOLD enemies it
+# shows enemy counts per cell (darkest to brightest) instead of single dots.
+MINIMAP_X, MINIMAP_Y          = 200, 5
+MINIMAP_WIDTH, MINIMAP_HEIGHT = 50, 40
+MINIMAP_SCALE                 = 5
+MINIMAP_REFRESH               = 4
+MINIMAP_DENSITY_THRESHOLD     = 500
+MINIMAP_DENSITY_COLORS        = [1, 2, 8, 9, 10, 7]  # 1, 2-3, 4-7, 8-15, 16-31, 32+ enemies
+
+# Quality tiers, best first. The governor steps down a tier when the average
+# update+draw time of the last QUALITY_WINDOW frames exceeds QUALITY_DOWN of the
+# frame budget, and back up when it falls below QUALITY_UP, waiting at least
+# QUALITY_HOLD frames between changes.
+#   particles: Fraction of particles spawned    trail: Engine-trail pixels
+#   star_layers: Starfield layers drawn
+QUALITY_TIERS = [
+    {'name': 'high',    'particles': 1.0,  'trail': 5, 'star_layers': 4},
+    {'name': 'medium',  'particles': 0.5,  'trail': 3, 'star_layers': 3},
+    {'name': 'low',     'particles': 0.25, 'trail': 1, 'star_layers': 2},
+    {'name': 'minimal', 'particles': 0.1,  'trail': 0, 'star_layers': 1},
+]
+FRAME_BUDGET   = 1 / 60  # Seconds per frame at 60 fps
+QUALITY_WINDOW = 60
+QUALITY_DOWN   = 0.9
+QUALITY_UP     = 0.5
+QUALITY_HOLD   = 120
+QUALITY_NOTICE = 120  # Frames a tier change stays on the HUD
+
+# Boss bullet patterns, cycled every BOSS_PHASE_FRAMES frames. Each volley fires
+# `emitters` bullets, `step` radians apart and centered on `angle` (0 = straight
+# down), rotated by `spin` radians per volley. Bullet velocity is the direction
+# times `speed` plus `drift`; emitters sit `spacing` pixels apart horizontally.
+BOSS_PHASE_FRAMES = 180
+BOSS_PATTERNS = [
+    {'name': 'straight', 'emitters': 5,  'step': 0.0,             'speed': 4, 'cadence': 8,
+     'spacing': 30},
+    {'name': 'fan',      'emitters': 7,  'step': 0.3,             'speed': 3, 'cadence': 12,
+     'drift': (0, 2)},
+    {'name': 'circle',   'emitters': 12, 'step': math.pi * 2 / 12, 'speed': 2, 'cadence': 15,
+     'angle': math.pi / 12, 'drift': (0, 1)},
+]
+
+# Procedural sprites for image bank 0, as ASCII art: each palette letter is a
+# Pyxel color and '0' is transparent. init_graphics compiles them into
+# Image.set rows on every launch (faster than loading a saved .pyxres).
+SPRITES = [
+    # Player ship (16x16)
+    {'name': 'ship', 'x': 0, 'y': 0, 'palette': {'B': 11}, 'rows': [
+        "0000000000000000",
+        "0000000BB0000000",
+        "000000BBBB000000",
+        "00000BBBBBB00000",
+        "0000BB0BB0BB0000",
+        "000BB00BB00BB000",
+        "00BB000BB000BB00",
+        "0BB0000BB0000BB0",
+        "BB00000BB00000BB",
+        "B000000BB000000B",
+        "0000000BB0000000",
+        "000000BBBB000000",
+        "00000BB00BB00000",
+        "0000BB0000BB0000",
+        "000BB000000BB000",
+        "00B00000000B0000"]},
+    # Enemy (8x8)
+    {'name': 'enemy', 'x': 16, 'y': 0, 'palette': {'R': 8}, 'rows': [
+        "00RRRR00",
+        "0RR00RR0",
+        "RRR00RRR",
+        "RRR00RRR",
+        "RRRRRRRR",
+        "0RR00RR0",
+        "R0R00R0R",
+        "0RR00RR0"]},
+    # Power-up (8x8)
+    {'name': 'powerup', 'x': 24, 'y': 0, 'palette': {'Y': 10}, 'rows': [
+        "00YYYY00",
+        "0YYYYYY0",
+        "YYYYYYYY",
+        "YYY00YYY",
+        "YYY00YYY",
+        "YYYYYYYY",
+        "0YYYYYY0",
+        "00YYYY00"]},
+    # Boss (32x32)
+    {'name': 'boss', 'x': 32, 'y': 8, 'palette': {'R': 8}, 'rows': [
+        "00000000RRRRRRRR00000000RRRRRRRR",
+        "0000000RRRRRRRRRR0000RRRRRRRRRR0",
+        "000000RRRRRRRRRRRR00RRRRRRRRRRRR",
+        "00000RRRRRRRRRRRRRRRRRRRRRRRRRR0",
+        "0000RRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "000RRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "00RRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "0RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRR0000RRRR0000RRRRRRRRRR",
+        "RRRRRRRRRR0000RRRR0000RRRRRRRRRR",
+        "RRRRRRRRRR0000RRRR0000RRRRRRRRRR",
+        "RRRRRRRRRR0000RRRR0000RRRRRRRRRR",
+        "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRR00RRRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRR0000RRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRR000000RRRRRRRRRRRRRR",
+        "RRRRRRRRRRR00000000RRRRRRRRRRRRR",
+        "RRRRRRRRRR0000000000RRRRRRRRRRRR",
+        "RRRRRRRRR000000000000RRRRRRRRRRR",
+        "RRRRRRRR00000000000000RRRRRRRRRR",
+        "RRRRRRR0000000000000000RRRRRRRRR",
+        "RRRRRR000000000000000000RRRRRRRR",
+        "RRRRR00000000000000000000RRRRRRR",
+        "RRRR0000000000000000000000RRRRRR",
+        "RRR000000000000000000000000RRRRR"]},
+]
+
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)  # Color -> ASCII hex digit
+
+def pixel_rows(pixels):
+    """Image.set rows for a 2D array of palette colors (0 = transparent)"""
+    width = pixels.shape[1]
+    text = HEX_DIGITS[pixels].tobytes().decode()
+    return [text[i:i + width] for i in range(0, len(text), width)]
+
+def image_from_pixels(pixels):
+    """New Image holding a 2D array of palette colors, written with one Image.set"""
+    height, width = pixels.shape
+    image = pyxel.Image(width, height)
+    image.set(0, 0, pixel_rows(pixels))
+    return image
+
+def compile_sprite(sprite):
+    """Translate ASCII sprite rows into Image.set rows (one hex color digit per pixel)"""
+    digits = {char: f"{color:x}" for char, color in sprite['palette'].items()}
+    return [''.join(digits.get(char, '0') for char in row) for row in sprite['rows']]
+
+class EntityStore:
+    """Typed storage for one kind of entity (bullets, enemies, ...)
+    Every field is a NumPy array and live entities occupy indices [0, count).
+    store['x'] is the live view of a field, so whole-store updates are
+    vectorized. Deletion is batched: remove_where compacts the survivors of a
+    mask in one pass per field, so nothing is ever copied as a list."""
     
-    def __init__(self, x, y, vx, vy, color, life=60):
-        """Initialize particle
+    def __init__(self, fields, capacity=64):
+        """Initialize empty storage
         Args:
-            x, y: Initial position
-            vx, vy: Velocity vector
-            color: Color (Pyxel 16-color palette)
+            fields: Field name -> NumPy dtype
+            capacity: Initial capacity (doubles when full)
+        """
+        self.fields = fields
+        self.capacity = capacity
+        self.count = 0
+        for name, dtype in fields.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, name):
+        """Live view of a field (only valid until the next add)"""
+        return getattr(self, name)[:self.count]
+    
+    def __setitem__(self, name, values):
+        """Assign to every live entity of a field (also makes store['x'] += v work)"""
+        getattr(self, name)[:self.count] = values
+    
+    def clear(self):
+        """Remove all entities"""
+        self.count = 0
+    
+    def reserve(self, n):
+        """Make room for n more entities"""
+        needed = self.count + n
+        if needed <= self.capacity:
+            return
+        while self.capacity < needed:
+            self.capacity *= 2
+        for name in self.fields:
+            array = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+    
+    def add(self, **values):
+        """Add one entity; every field must be given
+        Returns:
+            int: Index of the new entity
+        """
+        self.reserve(1)
+        index = self.count
+        for name, value in values.items():
+            getattr(self, name)[index] = value
+        self.count += 1
+        return index
+    
+    def add_many(self, **values):
+        """Add entities in bulk; values are scalars or equally long arrays"""
+        n = max(np.size(value) for value in values.values())
+        self.reserve(n)
+        for name, value in values.items():
+            getattr(self, name)[self.count:self.count + n] = value
+        self.count += n
+    
+    def remove_where(self, mask):
+        """Delete every entity whose mask entry is True (vectorized)"""
+        keep = ~mask
+        kept = int(np.count_nonzero(keep))
+        if kept == self.count:
+            return
+        for name in self.fields:
+            array = getattr(self, name)
+            array[:kept] = array[:self.count][keep]
+        self.count = kept
+
+class SpatialHash:
+    """Uniform-grid broadphase over the 256x192 playfield
+    Rebuilt once per frame from point positions with a counting sort: the
+    point indices are ordered by cell, and cell k holds
+    order[starts[k]:starts[k + 1]]. Points outside the playfield are clamped
+    into the border cells, so nothing is ever missed."""
+    
+    def __init__(self, width=256, height=192, cell=16):
+        """Initialize the grid
+        Args:
+            width, height: Playfield size in pixels
+            cell: Cell size in pixels
+        """
+        self.cell = cell
+        self.cols = width // cell
+        self.rows = height // cell
+        self.order = np.zeros(0, dtype=np.int64)
+        self.starts = np.zeros(self.cols * self.rows + 1, dtype=np.int64)
+    
+    def build(self, x, y):
+        """Bucket the points (x[i], y[i]) by cell"""
+        cx = np.clip(x // self.cell, 0, self.cols - 1).astype(np.int64)
+        cy = np.clip(y // self.cell, 0, self.rows - 1).astype(np.int64)
+        keys = cy * self.cols + cx
+        self.order = np.argsort(keys, kind='stable')
+        counts = np.bincount(keys, minlength=self.cols * self.rows)
+        self.starts[1:] = np.cumsum(counts)
+    
+    def query(self, x0, y0, x1, y1):
+        """Indices of the points in every cell overlapping the box [x0, x1] x [y0, y1]"""
+        c0 = min(max(int(x0 // self.cell), 0), self.cols - 1)
+        c1 = min(max(int(x1 // self.cell), 0), self.cols - 1)
+        r0 = min(max(int(y0 // self.cell), 0), self.rows - 1)
+        r1 = min(max(int(y1 // self.cell), 0), self.rows - 1)
+        # The cells of one grid row are contiguous in key order: one slice per row
+        parts = [self.order[self.starts[r * self.cols + c0]:self.starts[r * self.cols + c1 + 1]]
+                 for r in range(r0, r1 + 1)]
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+    
+    def pairs(self, qx, qy, half_w, half_h):
+        """Candidate pairs for many query boxes at once (vectorized)
+        Returns (queries, points): index arrays pairing query i with every point
+        in the cells overlapping the box [qx - half_w, qx + half_w] x
+        [qy - half_h, qy + half_h]. The caller does the exact overlap test."""
+        c0 = np.clip((qx - half_w) // self.cell, 0, self.cols - 1).astype(np.int64)
+        c1 = np.clip((qx + half_w) // self.cell, 0, self.cols - 1).astype(np.int64)
+        r0 = np.clip((qy - half_h) // self.cell, 0, self.rows - 1).astype(np.int64)
+        r1 = np.clip((qy + half_h) // self.cell, 0, self.rows - 1).astype(np.int64)
+        queries, points = [], []
+        # One pass per grid row a box can span; each box row is one contiguous slice
+        for dr in range(int(np.max(r1 - r0, initial=-1)) + 1):
+            q = np.flatnonzero(r0 + dr <= r1)
+            keys = (r0[q] + dr) * self.cols
+            begin = self.starts[keys + c0[q]]
+            lengths = self.starts[keys + c1[q] + 1] - begin
+            total = int(lengths.sum())
+            if not total:
+                continue
+            # Expand every slice [begin, begin + length) into explicit positions
+            offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            queries.append(np.repeat(q, lengths))
+            points.append(self.order[np.repeat(begin, lengths) + offsets])
+        if not queries:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(queries), np.concatenate(points)
+
+class BulletPattern:
+    """Boss bullet pattern compiled from its data description (see BOSS_PATTERNS)
+    The per-emitter velocities and offsets are computed once; a volley (fired
+    every `cadence` frames by the game's event scheduler) is a single add_many
+    into the bullet store, plus one rotation for spinning patterns, so no
+    trigonometry is done per bullet."""
+    
+    def __init__(self, name, emitters, speed, cadence, step=0.0, angle=0.0, spin=0.0,
+                 spacing=0, drift=(0, 0), offset_y=16):
+        """Compile the pattern
+        Args:
+            name: Pattern name
+            emitters: Bullets per volley
+            speed: Bullet speed (pixels per frame)
+            cadence: Frames between volleys
+            step: Angle between neighbouring emitters (radians)
+            angle: Direction of the middle emitter (radians, 0 = down)
+            spin: Rotation of the whole volley per volley fired (radians)
+            spacing: Horizontal distance between neighbouring emitters (pixels)
+            drift: Velocity (vx, vy) added to every bullet
+            offset_y: Emitter height below the boss center
+        """
+        self.name = name
+        self.cadence = cadence
+        self.spin = spin
+        self.drift_x, self.drift_y = drift
+        self.offset_y = offset_y
+        slots = np.arange(emitters) - (emitters - 1) / 2
+        directions = angle + slots * step
+        self.offset_x = slots * spacing
+        self.vx = np.sin(directions) * speed  # Direction table (scaled by speed)
+        self.vy = np.cos(directions) * speed
+    
+    def fire(self, bullets, x, y, volley):
+        """Emit volley number `volley` into the bullet store"""
+        vx, vy = self.vx, self.vy
+        if self.spin:
+            turn = self.spin * volley
+            c, s = math.cos(turn), math.sin(turn)
+            vx, vy = vx * c + vy * s, vy * c - vx * s
+        bullets.add_many(x=x + self.offset_x, y=y + self.offset_y,
+                         vx=vx + self.drift_x, vy=vy + self.drift_y, owner=BULLET_ENEMY)
+
+class RandomService:
+    """Shared, seedable random numbers for the whole game
+    Scalar draws are served from a block of floats pre-generated by a NumPy
+    Generator (refilled when used up), so a draw in a per-frame loop is a list
+    lookup instead of a call into the random module. Array draws (size=n) go
+    to the same Generator, so one seed reproduces the whole stream."""
+    
+    def __init__(self, seed=None, block=4096):
+        """Initialize the generator
+        Args:
+            seed: Seed for reproducible runs (None: fresh entropy)
+            block: Scalar values generated per refill
+        """
+        self.seed = seed
+        self.generator = np.random.default_rng(seed)
+        self.block = block
+        self.values = []
+        self.index = 0
+    
+    def next(self):
+        """Next buffered float in [0, 1)"""
+        if self.index == len(self.values):
+            self.values = self.generator.random(self.block).tolist()
+            self.index = 0
+        value = self.values[self.index]
+        self.index += 1
+        return value
+    
+    def random(self, size=None):
+        """Float(s) in [0, 1)"""
+        if size is None:
+            return self.next()
+        return self.generator.random(size)
+    
+    def uniform(self, low, high, size=None):
+        """Float(s) in [low, high)"""
+        if size is None:
+            return low + (high - low) * self.next()
+        return self.generator.uniform(low, high, size)
+    
+    def integers(self, low, high, size=None):
+        """Integer(s) in [low, high) (high is exclusive, as in NumPy)"""
+        if size is None:
+            return low + int((high - low) * self.next())
+        return self.generator.integers(low, high, size)
+    
+    def choice(self, options, size=None):
+        """Random element(s) of a sequence"""
+        if size is None:
+            return options[int(len(options) * self.next())]
+        return self.generator.choice(options, size)
+    
+    def geometric(self, p, size=None):
+        """Number of trials (1, 2, ...) up to the first success of chance p"""
+        if size is None:
+            return 1 + int(math.log(1.0 - self.next()) / math.log(1.0 - p))
+        return self.generator.geometric(p, size)
+
+class EventScheduler:
+    """Timers kept in one min-heap per channel
+    Instead of rolling a die for everything on every frame, the time of the
+    next event is drawn once and scheduled; each frame only the events that
+    are due are popped. A channel's clock can be anything that only grows
+    (frames, kills, ...). Events of removed objects are simply ignored by
+    the caller when they come due."""
+    
+    def __init__(self):
+        self.channels = {}  # Channel name -> heap of (time, sequence, key)
+        self.sequence = 0   # Keeps equal times in scheduling order
+    
+    def schedule(self, channel, time, key=None):
+        """Schedule an event for `key` on a channel at the given time"""
+        heapq.heappush(self.channels.setdefault(channel, []), (time, self.sequence, key))
+        self.sequence += 1
+    
+    def pop_due(self, channel, now):
+        """Remove and return the keys of every event with time <= now"""
+        heap = self.channels.get(channel)
+        due = []
+        while heap and heap[0][0] <= now:
+            due.append(heapq.heappop(heap)[2])
+        return due
+    
+    def clear(self, channel=None):
+        """Drop the events of one channel (None: all channels)"""
+        if channel is None:
+            self.channels.clear()
+        else:
+            self.channels.pop(channel, None)
+
+class ParticleSystem:
+    """Particle effect pool for visual effects
+    Represents explosions, muzzle flashes, and other visual effects.
+    Particles are stored as NumPy arrays (structure of arrays) with a fixed
+    capacity, so a whole frame of particles is integrated in a few vectorized
+    operations instead of one Python object per particle.
+    Drawing uses one pset per particle up to RASTER_THRESHOLD visible
+    particles; above that they are rasterized with NumPy into a screen-sized
+    image drawn with one blt (about 1.5 ms at 50,000 particles, Image.set
+    included). Color 0 is transparent there, so particles should not use it."""
+    
+    GRAVITY = 0.1           # Added to vy every frame
+    RASTER_THRESHOLD = 1000  # Visible particles above which draw() rasterizes
+    WIDTH, HEIGHT = 256, 192
+    
+    def __init__(self, rng, capacity=50000):
+        """Initialize particle pool
+        Args:
+            rng: RandomService for visual effects
+            capacity: Maximum number of live particles (extra spawns are dropped)
+        """
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)      # Position
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)     # Velocity
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.uint8)    # Color (Pyxel 16-color palette)
+        self.life = np.zeros(capacity, dtype=np.int32)     # Remaining lifespan (in frames)
+        self.max_life = np.zeros(capacity, dtype=np.int32)
+        self.count = 0  # Live particles occupy indices [0, count)
+        self.rng = rng
+        self.canvas = np.zeros((self.HEIGHT, self.WIDTH), dtype=np.uint8)  # Raster target
+        self.image = None
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        """Remove all particles"""
+        self.count = 0
+    
+    def spawn(self, x, y, vx, vy, color, life):
+        """Add particles in bulk
+        Args:
+            x, y, vx, vy, color, life: Scalars or equally long arrays
+        Returns:
+            int: Number of particles actually added
+        """
+        n = max(np.size(x), np.size(y), np.size(vx), np.size(vy), np.size(color), np.size(life))
+        n = min(n, self.capacity - self.count)
+        if n <= 0:
+            return 0
+        start, end = self.count, self.count + n
+        for array, values in ((self.x, x), (self.y, y), (self.vx, vx), (self.vy, vy),
+                              (self.color, color), (self.life, life), (self.max_life, life)):
+            array[start:end] = values if np.ndim(values) == 0 else values[:n]
+        self.count = end
+        return n
+    
+    def spawn_spray(self, x, y, n, spread_x, vx_range, vy_range, colors, life):
+        """Spray n particles from (x, y) (e.g. muzzle flash)
+        Args:
+            spread_x: Start X varies by up to +/- spread_x (integer pixels)
+            vx_range, vy_range: (min, max) of the uniformly random velocity
+            colors: Colors to pick from at random
             life: Lifespan (in frames)
         """
-        self.x = x
-        self.y = y
-        self.vx = vx  # X-direction velocity
-        self.vy = vy  # Y-direction velocity
-        self.color = color
-        self.life = life
-        self.max_life = life
+        if n <= 0:
+            return 0
+        rng = self.rng
+        return self.spawn(x + rng.integers(-spread_x, spread_x + 1, n),
+                          np.full(n, y, dtype=np.float32),
+                          rng.uniform(*vx_range, n), rng.uniform(*vy_range, n),
+                          rng.choice(colors, n), life)
+    
+    def spawn_burst(self, x, y, n, speed_range, colors, life_range):
+        """Burst n particles from (x, y) in random directions (e.g. explosion)
+        Args:
+            speed_range: (min, max) of the uniformly random speed
+            colors: Colors to pick from at random
+            life_range: (min, max) lifespan in frames, both inclusive
+        """
+        if n <= 0:
+            return 0
+        rng = self.rng
+        angle = rng.uniform(0, math.pi * 2, n)
+        speed = rng.uniform(*speed_range, n)
+        return self.spawn(np.full(n, x, dtype=np.float32), np.full(n, y, dtype=np.float32),
+                          np.cos(angle) * speed, np.sin(angle) * speed,
+                          rng.choice(colors, n),
+                          rng.integers(life_range[0], life_range[1] + 1, n))
     
     def update(self):
-        """Update particle state
-        Returns:
-            bool: Whether the particle is still alive
+        """Integrate all particles (velocity, gravity, lifespan) and drop expired ones"""
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]  # Update position with velocity
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += self.GRAVITY  # Add gravity effect
+        self.life[:n] -= 1  # Decrease lifespan
+        alive = self.life[:n] > 0
+        kept = int(np.count_nonzero(alive))
+        if kept < n:
+            # Pack the surviving particles to the front of every array
+            for array in (self.x, self.y, self.vx, self.vy, self.color, self.life, self.max_life):
+                array[:kept] = array[:n][alive]
+            self.count = kept
+    
+    def draw(self):
+        """Draw particles that still have more than half of their lifespan"""
+        n = self.count
+        visible = self.life[:n] * 2 > self.max_life[:n]
+        x, y, color = self.x[:n][visible], self.y[:n][visible], self.color[:n][visible]
+        if x.size <= self.RASTER_THRESHOLD:
+            for px, py, pcolor in zip(x.tolist(), y.tolist(), color.tolist()):
+                pyxel.pset(px, py, pcolor)
+            return
+        
+        # Many particles: plot them all into the canvas and draw it once
+        xi = np.floor(x).astype(np.int64)
+        yi = np.floor(y).astype(np.int64)
+        on_screen = (xi >= 0) & (xi < self.WIDTH) & (yi >= 0) & (yi < self.HEIGHT)
+        canvas = self.canvas
+        canvas.fill(0)
+        canvas[yi[on_screen], xi[on_screen]] = color[on_screen]
+        if self.image is None:
+            self.image = pyxel.Image(self.WIDTH, self.HEIGHT)
+        self.image.set(0, 0, pixel_rows(canvas))
+        pyxel.blt(0, 0, self.image, 0, 0, self.WIDTH, self.HEIGHT, 0)
+
+class Starfield:
+    """Parallax starfield pre-rendered into tiling layers
+    Stars are grouped into speed bands and every band is baked once into a
+    screen-sized image. Each frame a layer is drawn with two blt calls at a
+    scroll offset of time * band speed, so the cost does not depend on the
+    number of stars."""
+    
+    WIDTH, HEIGHT = 256, 192
+    
+    def __init__(self, rng, count=STAR_COUNT, bands=STAR_BANDS):
+        """Scatter the stars (the layers are baked on first draw)
+        Args:
+            rng: RandomService for visual effects
+            count: Number of stars
+            bands: Number of speed bands (layers)
+        """
+        low, high = STAR_SPEED_RANGE
+        speed = rng.uniform(low, high, count)
+        # Every band scrolls at the speed in the middle of its range
+        self.band = np.minimum(((speed - low) / (high - low) * bands).astype(np.int64), bands - 1)
+        self.speeds = [low + (high - low) * (i + 0.5) / bands for i in range(bands)]
+        self.x = rng.integers(0, self.WIDTH, count)
+        self.y = rng.integers(0, self.HEIGHT, count)
+        self.color = rng.choice(STAR_COLORS, count)
+        self.layers = None
+        self.time = 0  # Frames scrolled so far
+    
+    def update(self):
+        self.time += 1
+    
+    def bake(self):
+        """Render every band into its own transparent layer image"""
+        self.layers = []
+        for i in range(len(self.speeds)):
+            in_band = self.band == i
+            pixels = np.zeros((self.HEIGHT, self.WIDTH), dtype=np.int64)
+            pixels[self.y[in_band], self.x[in_band]] = self.color[in_band]
+            self.layers.append(image_from_pixels(pixels))
+    
+    def draw(self, layers=None):
+        """Draw the layers at their scroll offsets (two blt calls per layer)
+        Args:
+            layers: Draw only this many layers, slowest first (None: all)
+        """
+        if self.layers is None:
+            self.bake()
+        for layer, speed in zip(self.layers[:layers], self.speeds):
+            offset = int(self.time * speed) % self.HEIGHT
+            pyxel.blt(0, offset - self.HEIGHT, layer, 0, 0, self.WIDTH, self.HEIGHT, 0)
+            pyxel.blt(0, offset, layer, 0, 0, self.WIDTH, self.HEIGHT, 0)
+
+class ExplosionAtlas:
+    """Explosion animations pre-rendered into one atlas image
+    Frame r of a variant scatters r pixels at distances 0..r-1 from the
+    center in random directions. Column = radius, row = variant, so an
+    explosion is drawn with a single blt."""
+    
+    SIZE = 64  # Frame size in pixels (fits the largest radius)
+    
+    def __init__(self, rng, frames=EXPLOSION_LIFE + 1, variants=EXPLOSION_VARIANTS):
+        """Render every frame of every variant (the image is created on first draw)
+        Args:
+            rng: RandomService for visual effects
+            frames: Frames per animation (radius 0 to frames - 1)
+            variants: Number of different animations
+        """
+        self.frames = frames
+        self.variants = variants
+        center = self.SIZE // 2
+        self.pixels = np.zeros((variants * self.SIZE, frames * self.SIZE), dtype=np.int64)
+        for variant in range(variants):
+            for radius in range(frames):
+                distance = np.arange(radius)
+                angle = rng.uniform(0, math.pi * 2, radius)
+                x = np.floor(center + np.cos(angle) * distance).astype(np.int64)
+                y = np.floor(center + np.sin(angle) * distance).astype(np.int64)
+                self.pixels[variant * self.SIZE + y, radius * self.SIZE + x] = \
+                    rng.choice(EXPLOSION_COLORS, radius)
+        self.image = None
+    
+    def draw(self, x, y, radius, variant):
+        """Draw one explosion frame centered on (x, y)"""
+        if self.image is None:
+            self.image = image_from_pixels(self.pixels)
+        frame = min(radius, self.frames - 1)
+        pyxel.blt(x - self.SIZE // 2, y - self.SIZE // 2, self.image,
+                  frame * self.SIZE, variant * self.SIZE, self.SIZE, self.SIZE, 0)
+
+class Minimap:
+    """Mini-map rendered into its own image at a reduced rate
+    Every `refresh` frames the enemy positions are rasterized with NumPy into
+    an offscreen image; every frame costs one blt plus the player dot."""
+    
+    def __init__(self, refresh=MINIMAP_REFRESH, mode='auto'):
+        """Initialize the mini-map (the image is created on first draw)
+        Args:
+            refresh: Frames between re-renders
+            mode: 'points' (one dot per enemy), 'density' (counts per cell)
+                  or 'auto' (density above MINIMAP_DENSITY_THRESHOLD enemies)
+        """
+        self.refresh = refresh
+        self.mode = mode
+        self.image = None
+        self.frame = 0
+    
+    def render(self, enemy_x, enemy_y):
+        """Rasterize the border and the enemies into the mini-map image"""
+        width, height = MINIMAP_WIDTH, MINIMAP_HEIGHT
+        pixels = np.zeros((height, width), dtype=np.int64)
+        cx = (enemy_x // MINIMAP_SCALE).astype(np.int64)
+        cy = (enemy_y // MINIMAP_SCALE).astype(np.int64)
+        inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+        cells = cy[inside] * width + cx[inside]
+        density = self.mode == 'density' or (
+            self.mode == 'auto' and len(enemy_x) > MINIMAP_DENSITY_THRESHOLD)
+        if density:
+            counts = np.bincount(cells, minlength=width * height).reshape(height, width)
+            level = np.minimum(np.log2(np.maximum(counts, 1)).astype(np.int64),
+                               len(MINIMAP_DENSITY_COLORS) - 1)
+            pixels[counts > 0] = np.array(MINIMAP_DENSITY_COLORS)[level[counts > 0]]
+        else:
+            pixels.reshape(-1)[cells] = 8
+        pixels[[0, -1], :] = 7  # Border
+        pixels[:, [0, -1]] = 7
+        if self.image is None:
+            self.image = pyxel.Image(width, height)
+        self.image.set(0, 0, pixel_rows(pixels))
+    
+    def draw(self, enemy_x, enemy_y, player_x, player_y):
+        """Draw the mini-map, re-rendering it every `refresh` frames"""
+        if self.image is None or self.frame % self.refresh == 0:
+            self.render(enemy_x, enemy_y)
+        self.frame += 1
+        pyxel.blt(MINIMAP_X, MINIMAP_Y, self.image, 0, 0, MINIMAP_WIDTH, MINIMAP_HEIGHT, 0)
+        pyxel.pset(MINIMAP_X + player_x // MINIMAP_SCALE, MINIMAP_Y + player_y // MINIMAP_SCALE, 11)
+
+class QualityGovernor:
+    """Pick a quality tier from the measured frame time
+    Keeps a rolling average of the update+draw time and moves one tier down
+    (cheaper effects) when it runs over budget or one tier up when there is
+    plenty of headroom. Tier changes are printed, and the last one is kept in
+    `notice` for the HUD."""
+    
+    def __init__(self, tiers=QUALITY_TIERS, budget=FRAME_BUDGET, pinned=None):
+        """Initialize at the best tier
+        Args:
+            tiers: Quality tiers, best first
+            budget: Frame time budget (seconds)
+            pinned: Name of a tier to stay at (disables adaptation)
+        Raises:
+            ValueError: pinned is not the name of a tier
         """
-        self.x += self.vx  # Update position with velocity
-        self.y += self.vy
-        self.vy += 0.1     # Add gravity effect
-        self.life -= 1     # Decrease lifespan
-        return self.life > 0
+        self.tiers = tiers
+        self.budget = budget
+        self.index = 0
+        self.pinned = pinned is not None
+        if self.pinned:
+            names = [tier['name'] for tier in tiers]
+            if pinned not in names:
+                raise ValueError(f"Unknown quality tier {pinned!r} "
+                                 f"(expected one of: {', '.join(names)})")
+            self.index = names.index(pinned)
+        self.samples = deque(maxlen=QUALITY_WINDOW)
+        self.total = 0.0     # Sum of the samples in the window
+        self.since_change = 0
+        self.notice = ""         # Text of the last tier change
+        self.notice_frames = 0   # Frames left to show it
+    
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+    
+    def record(self, seconds):
+        """Add one frame time and change tier if the average calls for it"""
+        if self.notice_frames:
+            self.notice_frames -= 1
+        if self.pinned:
+            return
+        if len(self.samples) == self.samples.maxlen:
+            self.total -= self.samples[0]
+        self.samples.append(seconds)
+        self.total += seconds
+        self.since_change += 1
+        if len(self.samples) < self.samples.maxlen or self.since_change < QUALITY_HOLD:
+            return
+        average = self.total / len(self.samples)
+        if average > self.budget * QUALITY_DOWN and self.index < len(self.tiers) - 1:
+            self.change(self.index + 1, average)
+        elif average < self.budget * QUALITY_UP and self.index > 0:
+            self.change(self.index - 1, average)
+    
+    def change(self, index, average):
+        print(f"Quality: {self.tier['name']} -> {self.tiers[index]['name']} "
+              f"(average frame {average * 1000:.1f} ms, budget {self.budget * 1000:.1f} ms)")
+        self.notice = f"Quality: {self.tiers[index]['name']} ({average * 1000:.1f} ms)"
+        self.notice_frames = QUALITY_NOTICE
+        self.index = index
+        self.samples.clear()
+        self.total = 0.0
+        self.since_change = 0
 
 class UltimatePyxelGame:
     """Main game class - Shooting game utilizing advanced Pyxel features"""
     
-    def __init__(self):
-        """Initialize the game"""
-        # pyxel.init: Initialize game screen (width, height, title, FPS)
-        pyxel.init(256, 192, title="Ultimate Pyxel Demo", fps=60)
-        # pyxel.mouse: Enable mouse cursor display
-        pyxel.mouse(True)
+    def __init__(self, headless=False, seed=None, quality=None):
+        """Initialize the game
+        Args:
+            headless: Set up the game state only (no window, sprites, audio or
+                      game loop), e.g. for benchmarks
+            seed: Seed of every random draw in the game (None: random run)
+                  Gameplay and visual effects get separate streams, so how
+                  often the game is drawn never changes the simulation.
+            quality: Name of a fixed quality tier (None: adapt to frame time)
+        """
+        self.headless = headless
+        gameplay_seed, effects_seed = np.random.SeedSequence(seed).spawn(2)
+        self.rng = RandomService(gameplay_seed)         # Simulation randomness
+        self.effects_rng = RandomService(effects_seed)  # Cosmetic randomness (draw-time too)
+        self.quality = QualityGovernor(pinned=quality)  # Effect levels
+        self.frame_start = 0.0
+        if not headless:
+            # pyxel.init: Initialize game screen (width, height, title, FPS)
+            pyxel.init(256, 192, title="Ultimate Pyxel Demo", fps=60)
+            # pyxel.mouse: Enable mouse cursor display
+            pyxel.mouse(True)
         
         # Game state management
         self.scene = "MENU"  # Current scene (MENU/GAME/GAMEOVER)
@@ -73,12 +878,19 @@ class UltimatePyxelGame:
         
         # Data structures for visual effects
         self.mouse_trails = deque(maxlen=20)  # Mouse trails (max 20 points)
-        self.particles = []    # List of particle effects
-        self.stars = []        # List of background stars
-        self.bullets = []      # List of bullets
-        self.enemies = []      # List of enemies
-        self.powerups = []     # List of power-up items
-        self.explosions = []   # List of explosion effects
+        self.particles = ParticleSystem(self.effects_rng)  # Particle effects (array-backed pool)
+        self.starfield = None                                  # Background stars
+        self.bullets = EntityStore(BULLET_FIELDS, 256)         # Bullets
+        self.enemies = EntityStore(ENEMY_FIELDS, 64)           # Enemies
+        self.powerups = EntityStore(POWERUP_FIELDS, 16)        # Power-up items
+        self.explosions = EntityStore(EXPLOSION_FIELDS, 32)    # Explosion effects
+        self.explosion_atlas = ExplosionAtlas(self.effects_rng)  # Pre-rendered explosion frames
+        self.minimap = Minimap()                               # Offscreen mini-map
+        self.collision_grid = SpatialHash()  # Broadphase for bullets and power-ups
+        self.enemy_grid = SpatialHash()      # Broadphase for enemies
+        self.events = EventScheduler()       # Enemy fire, boss volleys, power-up drops
+        self.next_enemy_id = 0               # Stable enemy ids for scheduled events
+        self.kills = 0                       # Enemies killed (clock of power-up drops)
         
         # Player information (managed as dictionary)
         self.player = {"x": 128, "y": 150, "vx": 0, "vy": 0, "health": 100}
@@ -92,121 +904,30 @@ class UltimatePyxelGame:
         self.enemies_defeated = 0   # Number of enemies defeated
         self.boss = None           # Boss information
         self.boss_active = False   # Boss battle flag
+        self.boss_patterns = [BulletPattern(**pattern) for pattern in BOSS_PATTERNS]
+        
+        self.schedule_powerup_drop()
+        
+        # Per-phase frame timings (F1 toggles the overlay when enabled)
+        self.profiler = FrameProfiler("demo")
         
         # Call initialization methods
-        self.init_graphics()  # Create sprites
-        self.init_audio()     # Set up audio
+        if not headless:
+            self.init_graphics()  # Create sprites
+            self.init_audio()     # Set up audio
         self.create_starfield()  # Generate starfield background
         
-        # pyxel.run: Start game loop (specify update and draw functions)
-        pyxel.run(self.update, self.draw)
+        if not headless:
+            # pyxel.run: Start game loop (specify update and draw functions)
+            pyxel.run(self.update, self.draw)
     
     def init_graphics(self):
         """Initialize graphics assets - Procedural sprite generation"""
         # pyxel.images[0].cls: Clear image bank 0 (fill with transparent color 0)
         pyxel.images[0].cls(0)
-        
-        # Player ship sprite (16x16 pixels)
-        # Define pixel art with string array (0=transparent, B=color 11)
-        ship_data = [
-            "0000000000000000",
-            "0000000BB0000000",
-            "000000BBBB000000",
-            "00000BBBBBB00000",
-            "0000BB0BB0BB0000",
-            "000BB00BB00BB000",
-            "00BB000BB000BB00",
-            "0BB0000BB0000BB0",
-            "BB00000BB00000BB",
-            "B000000BB000000B",
-            "0000000BB0000000",
-            "000000BBBB000000",
-            "00000BB00BB00000",
-            "0000BB0000BB0000",
-            "000BB000000BB000",
-            "00B00000000B0000"
-        ]
-        # Convert string data to pixel data
-        for y, row in enumerate(ship_data):
-            for x, char in enumerate(row):
-                if char == 'B':
-                    # pyxel.images[0].pset: Set pixel at specified coordinates in image bank 0
-                    pyxel.images[0].pset(x, y, 11)
-        
-        # Enemy sprite (8x8 pixels) - Placed at x+16 position in image bank
-        enemy_data = [
-            "00RRRR00",
-            "0RR00RR0",
-            "RRR00RRR",
-            "RRR00RRR",
-            "RRRRRRRR",
-            "0RR00RR0",
-            "R0R00R0R",
-            "0RR00RR0"
-        ]
-        for y, row in enumerate(enemy_data):
-            for x, char in enumerate(row):
-                if char == 'R':
-                    # x+16 to avoid overlap with player sprite
-                    pyxel.images[0].pset(x + 16, y, 8)
-        
-        # Power-up sprite (8x8 pixels) - Placed at x+24 position in image bank
-        powerup_data = [
-            "00YYYY00",
-            "0YYYYYY0",
-            "YYYYYYYY",
-            "YYY00YYY",
-            "YYY00YYY",
-            "YYYYYYYY",
-            "0YYYYYY0",
-            "00YYYY00"
-        ]
-        for y, row in enumerate(powerup_data):
-            for x, char in enumerate(row):
-                if char == 'Y':
-                    # x+24 to avoid overlap with enemy sprite
-                    pyxel.images[0].pset(x + 24, y, 10)
-        
-        # Boss sprite (32x32 pixels) - Placed at x+32 position in image bank
-        boss_data = [
-            "00000000RRRRRRRR00000000RRRRRRRR",
-            "0000000RRRRRRRRRR0000RRRRRRRRRR0",
-            "000000RRRRRRRRRRRR00RRRRRRRRRRRR",
-            "00000RRRRRRRRRRRRRRRRRRRRRRRRRR0",
-            "0000RRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "000RRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "00RRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "0RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRR0000RRRR0000RRRRRRRRRR",
-            "RRRRRRRRRR0000RRRR0000RRRRRRRRRR",
-            "RRRRRRRRRR0000RRRR0000RRRRRRRRRR",
-            "RRRRRRRRRR0000RRRR0000RRRRRRRRRR",
-            "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRRRRRRRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRRR00RRRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRRR0000RRRRRRRRRRRRRRR",
-            "RRRRRRRRRRRR000000RRRRRRRRRRRRRR",
-            "RRRRRRRRRRR00000000RRRRRRRRRRRRR",
-            "RRRRRRRRRR0000000000RRRRRRRRRRRR",
-            "RRRRRRRRR000000000000RRRRRRRRRRR",
-            "RRRRRRRR00000000000000RRRRRRRRRR",
-            "RRRRRRR0000000000000000RRRRRRRRR",
-            "RRRRRR000000000000000000RRRRRRRR",
-            "RRRRR00000000000000000000RRRRRRR",
-            "RRRR0000000000000000000000RRRRRR",
-            "RRR000000000000000000000000RRRRR"
-        ]
-        for y, row in enumerate(boss_data):
-            for x, char in enumerate(row):
-                if char == 'R':
-                    # Place boss sprite at x+32, y+8
-                    pyxel.images[0].pset(x + 32, y + 8, 8)
+        for sprite in SPRITES:
+            # Image.set: Write whole rows of pixels at once
+            pyxel.images[0].set(sprite['x'], sprite['y'], compile_sprite(sprite))
     
     def init_audio(self):
         """Initialize audio system - Set up sound effects and BGM"""
@@ -232,16 +953,13 @@ class UltimatePyxelGame:
     
     def create_starfield(self):
         """Generate starfield background - Create random stars for parallax effect"""
-        for _ in range(100):
-            self.stars.append({
-                'x': random.randint(0, 255),      # random X coordinate
-                'y': random.randint(0, 191),      # random Y coordinate
-                'speed': random.uniform(0.5, 3.0),  # random speed
-                'color': random.choice([5, 6, 7, 12, 13])  # random color from Pyxel palette
-            })
+        self.starfield = Starfield(self.effects_rng, STAR_COUNT)
     
     def update(self):
+        self.frame_start = time.perf_counter()
         self.frame += 1
+        self.profiler.update()
+        self.profiler.start()
         
         # Mouse trail
         self.mouse_trails.append((pyxel.mouse_x, pyxel.mouse_y))
@@ -254,13 +972,15 @@ class UltimatePyxelGame:
             self.update_gameover()
         
         # Update particles
-        self.particles = [p for p in self.particles if p.update()]
+        self.particles.update()
+        self.profiler.lap("particles")
         
         # Update explosions
-        self.explosions = [e for e in self.explosions if e['life'] > 0]
-        for explosion in self.explosions:
-            explosion['life'] -= 1
-            explosion['radius'] += 1
+        explosions = self.explosions
+        explosions.remove_where(explosions['life'] <= 0)
+        explosions['life'] -= 1
+        explosions['radius'] += 1
+        self.profiler.lap("explosions")
     
     def update_menu(self):
         if pyxel.btnp(pyxel.KEY_SPACE) or pyxel.btnp(pyxel.MOUSE_BUTTON_LEFT):
@@ -268,15 +988,25 @@ class UltimatePyxelGame:
             pyxel.playm(0, loop=True)
     
     def update_game(self):
+        self.profiler.lap("scene")
         self.update_player()
+        self.profiler.lap("player")
         self.update_bullets()
+        self.profiler.lap("bullets")
         self.update_enemies()
+        self.profiler.lap("enemies")
         self.update_powerups()
+        self.profiler.lap("powerups")
         self.update_starfield()
+        self.profiler.lap("starfield")
         self.update_boss()
+        self.profiler.lap("boss")
         self.check_collisions()
+        self.profiler.lap("collisions")
         self.spawn_enemies()
+        self.profiler.lap("spawn")
         self.camera_shake()
+        self.profiler.lap("camera")
     
     def update_player(self):
         """Update player state - Handle movement, shooting, and mouse tracking"""
@@ -302,77 +1032,67 @@ class UltimatePyxelGame:
         
         # space key to shoot
         if self.frame % 5 == 0 and pyxel.btn(pyxel.KEY_SPACE):
-            self.bullets.append({
-                'x': self.player['x'],
-                'y': self.player['y'] - 8,
-                'vx': 0,
-                'vy': -8,
-                'type': 'player'
-            })
+            self.bullets.add(x=self.player['x'], y=self.player['y'] - 8,
+                             vx=0, vy=-8, owner=BULLET_PLAYER)
             pyxel.play(0, 0)
             
             # Create muzzle flash particles
-            for _ in range(5):
-                self.particles.append(Particle(
-                    self.player['x'] + random.randint(-4, 4),
-                    self.player['y'] - 8,
-                    random.uniform(-2, 2),
-                    random.uniform(-4, -1),
-                    random.choice([9, 10, 11]),
-                    15
-                ))
+            count = round(5 * self.quality.tier['particles'])
+            self.particles.spawn_spray(self.player['x'], self.player['y'] - 8, count,
+                                       4, (-2, 2), (-4, -1), [9, 10, 11], 15)
     
     def update_bullets(self):
-        for bullet in self.bullets[:]:
-            bullet['x'] += bullet['vx']
-            bullet['y'] += bullet['vy']
-            
-            # Remove off-screen bullets
-            if bullet['y'] < -10 or bullet['y'] > 202 or bullet['x'] < -10 or bullet['x'] > 266:
-                self.bullets.remove(bullet)
+        bullets = self.bullets
+        bullets['x'] += bullets['vx']
+        bullets['y'] += bullets['vy']
+        
+        # Remove off-screen bullets
+        x, y = bullets['x'], bullets['y']
+        bullets.remove_where((y < -10) | (y > 202) | (x < -10) | (x > 266))
     
     def update_enemies(self):
-        for enemy in self.enemies[:]:
-            # Complex movement patterns
-            if enemy['type'] == 'sine':
-                enemy['y'] += enemy['speed']
-                enemy['x'] += math.sin(enemy['y'] * 0.1) * 2
-            elif enemy['type'] == 'spiral':
-                enemy['angle'] += 0.1
-                enemy['x'] += math.cos(enemy['angle']) * 2
-                enemy['y'] += enemy['speed']
-            else:
-                enemy['y'] += enemy['speed']
-                enemy['x'] += enemy.get('vx', 0)
-            
-            # Enemy shooting
-            if random.randint(0, 120) == 0:
-                self.bullets.append({
-                    'x': enemy['x'],
-                    'y': enemy['y'] + 8,
-                    'vx': 0,
-                    'vy': 3,
-                    'type': 'enemy'
-                })
-            
-            # Remove off-screen enemies
-            if enemy['y'] > 200:
-                self.enemies.remove(enemy)
+        enemies = self.enemies
+        if not enemies.count:
+            return
+        # Complex movement patterns (each pattern evaluated for its whole group)
+        x, y = self.enemy_positions(self.frame)
+        enemies['x'], enemies['y'] = x, y
+        
+        # Enemy shooting (only the enemies whose scheduled shot is due)
+        due = self.events.pop_due('enemy_fire', self.frame)
+        if due:
+            shooters = np.isin(enemies['id'], due)
+            if shooters.any():
+                self.bullets.add_many(x=x[shooters], y=y[shooters] + 8,
+                                      vx=0, vy=3, owner=BULLET_ENEMY)
+                for enemy_id in enemies['id'][shooters].tolist():
+                    self.schedule_enemy_fire(enemy_id)
+        
+        # Remove off-screen enemies
+        enemies.remove_where(y > 200)
+    
+    def enemy_positions(self, frame):
+        """Positions (x, y arrays) every live enemy has at the given frame"""
+        enemies = self.enemies
+        t = frame - enemies['spawn']
+        x = np.empty(enemies.count)
+        y = np.empty(enemies.count)
+        kind = enemies['type']
+        for enemy_type, move in ENEMY_PATTERNS.items():
+            group = kind == enemy_type
+            if group.any():
+                x[group], y[group] = move(t[group], enemies['x0'][group], enemies['y0'][group],
+                                          enemies['speed'][group], enemies['vx'][group])
+        return x, y
     
     def update_powerups(self):
-        for powerup in self.powerups[:]:
-            powerup['y'] += 2
-            powerup['angle'] += 0.2
-            
-            if powerup['y'] > 200:
-                self.powerups.remove(powerup)
+        powerups = self.powerups
+        powerups['y'] += 2
+        powerups['angle'] += 0.2
+        powerups.remove_where(powerups['y'] > 200)
     
     def update_starfield(self):
-        for star in self.stars:
-            star['y'] += star['speed']
-            if star['y'] > 191:
-                star['y'] = 0
-                star['x'] = random.randint(0, 255)
+        self.starfield.update()
     
     def spawn_enemies(self):
         """Spawn enemies based on game progression"""
@@ -388,15 +1108,27 @@ class UltimatePyxelGame:
         self.enemy_spawn_timer += 1
         if self.enemy_spawn_timer > max(30 - self.level * 2, 10):
             self.enemy_spawn_timer = 0
-            enemy_type = random.choice(['normal', 'sine', 'spiral'])
-            self.enemies.append({
-                'x': random.randint(20, 236),
-                'y': -10,
-                'speed': random.uniform(1, 3),
-                'type': enemy_type,
-                'angle': 0,
-                'vx': random.uniform(-1, 1) if enemy_type == 'normal' else 0
-            })
+            enemy_type = self.rng.choice(ENEMY_TYPES)
+            self.add_enemy(
+                x=self.rng.integers(20, 237),
+                y=-10,
+                speed=self.rng.uniform(1, 3),
+                enemy_type=enemy_type,
+                vx=self.rng.uniform(-1, 1) if enemy_type == ENEMY_NORMAL else 0
+            )
+    
+    def add_enemy(self, x, y, speed, enemy_type, vx=0):
+        """Add an enemy with a fresh id and schedule its first shot"""
+        enemy_id = self.next_enemy_id
+        self.next_enemy_id += 1
+        self.enemies.add(x=x, y=y, x0=x, y0=y, spawn=self.frame, speed=speed, vx=vx,
+                         type=enemy_type, id=enemy_id)
+        self.schedule_enemy_fire(enemy_id)
+    
+    def schedule_enemy_fire(self, enemy_id):
+        """Schedule the next shot of an enemy (same odds as a 1/121 roll every frame)"""
+        self.events.schedule('enemy_fire', self.frame + self.rng.geometric(ENEMY_FIRE_CHANCE),
+                             enemy_id)
     
     def spawn_boss(self):
         """Spawn the boss enemy - Initialize boss attributes and state"""
@@ -406,11 +1138,12 @@ class UltimatePyxelGame:
             'vx': 1,
             'health': 50,
             'max_health': 50,
-            'shoot_timer': 0,
-            'pattern': 0,  # 0: straight, 1: fan, 2: circle
+            'volley': 0,   # Volleys fired (drives spinning patterns)
+            'pattern': 0,  # Index into self.boss_patterns
             'phase_timer': 0
         }
         self.boss_active = True
+        self.events.schedule('boss_volley', self.frame + self.boss_patterns[0].cadence)
         self.shake_intensity = 20  # Start camera shake on boss spawn
     
     def update_boss(self):
@@ -423,134 +1156,149 @@ class UltimatePyxelGame:
         if self.boss['x'] <= 50 or self.boss['x'] >= 206:
             self.boss['vx'] *= -1
         
-        # Boss shooting timer and pattern management
-        self.boss['shoot_timer'] += 1
+        # Boss pattern management
         self.boss['phase_timer'] += 1
         
-        # Change shooting pattern every 180 frames
-        if self.boss['phase_timer'] > 180:
-            self.boss['pattern'] = (self.boss['pattern'] + 1) % 3
+        # Change shooting pattern every BOSS_PHASE_FRAMES frames
+        if self.boss['phase_timer'] > BOSS_PHASE_FRAMES:
+            self.boss['pattern'] = (self.boss['pattern'] + 1) % len(self.boss_patterns)
             self.boss['phase_timer'] = 0
+            # Restart the volley clock so the new pattern's cadence applies at once
+            self.events.clear('boss_volley')
+            pattern = self.boss_patterns[self.boss['pattern']]
+            self.events.schedule('boss_volley', self.frame + pattern.cadence)
         
-        # Boss shooting logic
-        if self.boss['pattern'] == 0:  # basic straight shots
-            if self.boss['shoot_timer'] % 8 == 0:
-                for i in range(5):
-                    self.bullets.append({
-                        'x': self.boss['x'] - 60 + i * 30,
-                        'y': self.boss['y'] + 16,
-                        'vx': 0,
-                        'vy': 4,
-                        'type': 'enemy'
-                    })
-        
-        elif self.boss['pattern'] == 1:  # yawning fan pattern
-            if self.boss['shoot_timer'] % 12 == 0:
-                for i in range(7):
-                    angle = (i - 3) * 0.3
-                    self.bullets.append({
-                        'x': self.boss['x'],
-                        'y': self.boss['y'] + 16,
-                        'vx': math.sin(angle) * 3,
-                        'vy': math.cos(angle) * 3 + 2,
-                        'type': 'enemy'
-                    })
-        
-        elif self.boss['pattern'] == 2:  # circle pattern
-            if self.boss['shoot_timer'] % 15 == 0:
-                for i in range(12):
-                    angle = i * math.pi * 2 / 12
-                    self.bullets.append({
-                        'x': self.boss['x'],
-                        'y': self.boss['y'] + 16,
-                        'vx': math.cos(angle) * 2,
-                        'vy': math.sin(angle) * 2 + 1,
-                        'type': 'enemy'
-                    })
+        # Boss shooting logic (one volley per cadence of the current pattern)
+        for _ in self.events.pop_due('boss_volley', self.frame):
+            pattern = self.boss_patterns[self.boss['pattern']]
+            pattern.fire(self.bullets, self.boss['x'], self.boss['y'], self.boss['volley'])
+            self.boss['volley'] += 1
+            self.events.schedule('boss_volley', self.frame + pattern.cadence)
     
     def check_collisions(self):
-        # Bullet vs enemy
-        for bullet in self.bullets[:]:
-            if bullet['type'] == 'player':
-                for enemy in self.enemies[:]:
-                    if (abs(bullet['x'] - enemy['x']) < 8 and 
-                        abs(bullet['y'] - enemy['y']) < 8):
-                        self.bullets.remove(bullet)
-                        self.enemies.remove(enemy)
-                        self.score += 100
-                        self.enemies_defeated += 1  # count defeated enemies 
-                        self.create_explosion(enemy['x'], enemy['y'])
-                        pyxel.play(1, 1)
-                        
-                        # Chance to spawn power-up
-                        if random.randint(0, 4) == 0:
-                            self.powerups.append({
-                                'x': enemy['x'],
-                                'y': enemy['y'],
-                                'angle': 0
-                            })
-                        break
-        
-        # player bullet vs boss
+        """Resolve every collision of the frame through spatial hashes
+        Bullets and power-ups go into one hash, which the boss and the player
+        query. Enemies go into a second hash and all player bullets are paired
+        with the enemies in their cells in one vectorized step; Python only
+        runs for confirmed hits, so the cost follows the actual contacts
+        instead of bullets x enemies."""
+        bullets = self.bullets
+        powerups = self.powerups
+        n = bullets.count
+        # Points of the hash: bullets are [0, n), power-ups are [n, n + powerups)
+        px = np.concatenate((bullets['x'], powerups['x']))
+        py = np.concatenate((bullets['y'], powerups['y']))
+        is_player_bullet = np.zeros(px.size, dtype=bool)
+        is_player_bullet[:n] = bullets['owner'] == BULLET_PLAYER
+        is_enemy_bullet = np.zeros(px.size, dtype=bool)
+        is_enemy_bullet[:n] = bullets['owner'] == BULLET_ENEMY
+        grid = self.collision_grid
+        grid.build(px, py)
+        used = np.zeros(px.size, dtype=bool)  # Bullets spent / power-ups collected
+        
+        def hits_near(candidates, mask, x, y, half_w, half_h):
+            """Unused candidates of the given kind within the box around (x, y)"""
+            return candidates[mask[candidates] & ~used[candidates] &
+                              (np.abs(px[candidates] - x) < half_w) &
+                              (np.abs(py[candidates] - y) < half_h)]
+        
+        # Player bullet vs enemy
+        enemies = self.enemies
+        shots = np.flatnonzero(is_player_bullet)
+        if enemies.count and shots.size:
+            ex, ey = enemies['x'], enemies['y']
+            self.enemy_grid.build(ex, ey)
+            shot, enemy = self.enemy_grid.pairs(px[shots], py[shots], 8, 8)
+            shot = shots[shot]
+            touching = (np.abs(ex[enemy] - px[shot]) < 8) & (np.abs(ey[enemy] - py[shot]) < 8)
+            shot, enemy = shot[touching], enemy[touching]
+            # Each enemy (in index order) takes the lowest unused bullet touching it
+            order = np.lexsort((shot, enemy))
+            killed = np.zeros(enemies.count, dtype=bool)
+            for i, j in zip(shot[order].tolist(), enemy[order].tolist()):
+                if killed[j] or used[i]:
+                    continue
+                used[i] = True
+                killed[j] = True
+                enemy_x, enemy_y = float(ex[j]), float(ey[j])
+                self.score += 100
+                self.enemies_defeated += 1  # count defeated enemies 
+                self.create_explosion(enemy_x, enemy_y)
+                pyxel.play(1, 1)
+                
+                # Power-up drop (scheduled in kills, 1 in 5 chance per kill)
+                self.kills += 1
+                if self.events.pop_due('powerup_drop', self.kills):
+                    self.powerups.add(x=enemy_x, y=enemy_y, angle=0)
+                    self.schedule_powerup_drop()
+            enemies.remove_where(killed)
+        
+        # player bullet vs boss (at most one hit per frame)
         if self.boss:
-            for bullet in self.bullets[:]:
-                if bullet['type'] == 'player':
-                    if (abs(bullet['x'] - self.boss['x']) < 32 and 
-                        abs(bullet['y'] - self.boss['y']) < 16):
-                        self.bullets.remove(bullet)
-                        self.boss['health'] -= 1
-                        self.create_explosion(bullet['x'], bullet['y'])
-                        pyxel.play(1, 1)
-                        
-                        if self.boss['health'] <= 0:
-                            self.create_explosion(self.boss['x'], self.boss['y'])
-                            self.score += 1000
-                            self.boss = None
-                            self.boss_active = False
-                            self.enemies_defeated = 0  # reset defeated count
-                        break
-        
-        # Enemy bullet vs player
-        for bullet in self.bullets[:]:
-            if bullet['type'] == 'enemy':
-                if (abs(bullet['x'] - self.player['x']) < 12 and 
-                    abs(bullet['y'] - self.player['y']) < 12):
-                    self.bullets.remove(bullet)
-                    self.player['health'] -= 10
-                    self.shake_intensity = 10
-                    
-                    if self.player['health'] <= 0:
-                        self.scene = "GAMEOVER"
-                        pyxel.stop()
+            boss_x, boss_y = self.boss['x'], self.boss['y']
+            candidates = grid.query(boss_x - 32, boss_y - 16, boss_x + 32, boss_y + 16)
+            hits = hits_near(candidates, is_player_bullet, boss_x, boss_y, 32, 16)
+            if hits.size:
+                i = hits.min()
+                used[i] = True
+                self.boss['health'] -= 1
+                self.create_explosion(float(px[i]), float(py[i]))
+                pyxel.play(1, 1)
+                
+                if self.boss['health'] <= 0:
+                    self.events.clear('boss_volley')
+                    self.create_explosion(self.boss['x'], self.boss['y'])
+                    self.score += 1000
+                    self.boss = None
+                    self.boss_active = False
+                    self.enemies_defeated = 0  # reset defeated count
+        
+        # Enemy bullets and power-ups vs player (one query for both)
+        player_x, player_y = self.player['x'], self.player['y']
+        candidates = grid.query(player_x - 12, player_y - 12, player_x + 12, player_y + 12)
+        hits = hits_near(candidates, is_enemy_bullet, player_x, player_y, 12, 12)
+        if hits.size:
+            used[hits] = True
+            self.player['health'] -= 10 * hits.size
+            self.shake_intensity = 10
+            
+            if self.player['health'] <= 0:
+                self.scene = "GAMEOVER"
+                pyxel.stop()
         
         # Power-up collection
-        for powerup in self.powerups[:]:
-            if (abs(powerup['x'] - self.player['x']) < 12 and 
-                abs(powerup['y'] - self.player['y']) < 12):
-                self.powerups.remove(powerup)
-                self.player['health'] = min(100, self.player['health'] + 20)
-                self.score += 50
-                pyxel.play(2, 2)
+        is_powerup = np.zeros(px.size, dtype=bool)
+        is_powerup[n:] = True
+        collected = hits_near(candidates, is_powerup, player_x, player_y, 12, 12)
+        for _ in range(collected.size):
+            self.player['health'] = min(100, self.player['health'] + 20)
+            self.score += 50
+            pyxel.play(2, 2)
+        used[collected] = True
+        
+        bullets.remove_where(used[:n])
+        # Power-ups dropped during this pass were added after the hash was built
+        collected_powerups = np.zeros(powerups.count, dtype=bool)
+        collected_powerups[:px.size - n] = used[n:]
+        powerups.remove_where(collected_powerups)
+    
+    def schedule_powerup_drop(self):
+        """Schedule the kill that drops the next power-up"""
+        self.events.schedule('powerup_drop', self.kills + self.rng.geometric(POWERUP_DROP_CHANCE))
     
     def create_explosion(self, x, y):
-        self.explosions.append({'x': x, 'y': y, 'life': 30, 'radius': 0})
+        self.explosions.add(x=x, y=y, life=EXPLOSION_LIFE, radius=0,
+                            variant=self.effects_rng.integers(0, EXPLOSION_VARIANTS))
         
         # Add explosion particles
-        for _ in range(15):
-            angle = random.uniform(0, math.pi * 2)
-            speed = random.uniform(1, 4)
-            self.particles.append(Particle(
-                x, y,
-                math.cos(angle) * speed,
-                math.sin(angle) * speed,
-                random.choice([8, 9, 10]),
-                random.randint(20, 40)
-            ))
+        count = round(15 * self.quality.tier['particles'])
+        self.particles.spawn_burst(x, y, count, (1, 4), [8, 9, 10], (20, 40))
     
     def camera_shake(self):
         if self.shake_intensity > 0:
-            self.camera['x'] = random.randint(-self.shake_intensity, self.shake_intensity)
-            self.camera['y'] = random.randint(-self.shake_intensity, self.shake_intensity)
+            shake = self.shake_intensity
+            self.camera['x'] = self.effects_rng.integers(-shake, shake + 1)
+            self.camera['y'] = self.effects_rng.integers(-shake, shake + 1)
             self.shake_intensity -= 1
         else:
             self.camera['x'] = 0
@@ -569,7 +1317,6 @@ class UltimatePyxelGame:
         # Clear all game objects
         self.mouse_trails.clear()
         self.particles.clear()
-        self.stars.clear()
         self.bullets.clear()
         self.enemies.clear()
         self.powerups.clear()
@@ -587,11 +1334,15 @@ class UltimatePyxelGame:
         self.enemies_defeated = 0
         self.boss = None
         self.boss_active = False
+        self.events.clear()
+        self.kills = 0
+        self.schedule_powerup_drop()
         
         # Recreate starfield
         self.create_starfield()
     
     def draw(self):
+        self.profiler.start()
         pyxel.cls(0)
         
         if self.scene == "MENU":
@@ -600,6 +1351,11 @@ class UltimatePyxelGame:
             self.draw_game()
         elif self.scene == "GAMEOVER":
             self.draw_gameover()
+        
+        # Profiler overlay (over the HUD, so every phase fits on screen)
+        self.profiler.draw_overlay(2, 2)
+        
+        self.quality.record(time.perf_counter() - self.frame_start)
     
     def draw_menu(self):
         # Animated background
@@ -618,24 +1374,28 @@ class UltimatePyxelGame:
         # Apply camera shake
         pyxel.camera(self.camera['x'], self.camera['y'])
         
+        self.profiler.lap("draw_clear")
+        
         # Draw starfield
-        for star in self.stars:
-            pyxel.pset(star['x'], star['y'], star['color'])
+        self.starfield.draw(self.quality.tier['star_layers'])
+        self.profiler.lap("draw_stars")
         
         # Draw player with sprite
         pyxel.blt(self.player['x'] - 8, self.player['y'] - 8, 0, 0, 0, 16, 16, 0)
         
         # Draw engine trail
-        for i in range(5):
+        for i in range(self.quality.tier['trail']):
             pyxel.pset(
-                self.player['x'] + random.randint(-2, 2),
+                self.player['x'] + self.effects_rng.integers(-2, 3),
                 self.player['y'] + 8 + i * 2,
-                random.choice([9, 10])
+                self.effects_rng.choice([9, 10])
             )
+        self.profiler.lap("draw_player")
         
         # Draw enemies
-        for enemy in self.enemies:
-            pyxel.blt(enemy['x'] - 4, enemy['y'] - 4, 0, 16, 0, 8, 8, 0)
+        for x, y in zip(self.enemies['x'].tolist(), self.enemies['y'].tolist()):
+            pyxel.blt(x - 4, y - 4, 0, 16, 0, 8, 8, 0)
+        self.profiler.lap("draw_enemies")
         
         # Draw boss
         if self.boss:
@@ -651,35 +1411,40 @@ class UltimatePyxelGame:
             pyxel.rect(bar_x, bar_y, bar_width, 4, 1)
             pyxel.rect(bar_x, bar_y, int(bar_width * health_ratio), 4, 8)
             pyxel.text(bar_x, bar_y - 8, "BOSS", 7)
+        self.profiler.lap("draw_boss")
         
         # Draw bullets
-        for bullet in self.bullets:
-            color = 11 if bullet['type'] == 'player' else 8
-            pyxel.rect(bullet['x'] - 1, bullet['y'] - 2, 2, 4, color)
+        bullets = self.bullets
+        for x, y, owner in zip(bullets['x'].tolist(), bullets['y'].tolist(),
+                               bullets['owner'].tolist()):
+            color = 11 if owner == BULLET_PLAYER else 8
+            pyxel.rect(x - 1, y - 2, 2, 4, color)
+        self.profiler.lap("draw_bullets")
         
         # Draw power-ups
-        for powerup in self.powerups:
-            pyxel.blt(powerup['x'] - 4, powerup['y'] - 4, 0, 24, 0, 8, 8, 0)
+        powerups = self.powerups
+        for px, py, pangle in zip(powerups['x'].tolist(), powerups['y'].tolist(),
+                                  powerups['angle'].tolist()):
+            pyxel.blt(px - 4, py - 4, 0, 24, 0, 8, 8, 0)
             # Rotating effect
             for i in range(4):
-                angle = powerup['angle'] + i * math.pi / 2
-                x = powerup['x'] + math.cos(angle) * 6
-                y = powerup['y'] + math.sin(angle) * 6
+                angle = pangle + i * math.pi / 2
+                x = px + math.cos(angle) * 6
+                y = py + math.sin(angle) * 6
                 pyxel.pset(x, y, 10)
+        self.profiler.lap("draw_powerups")
         
         # Draw explosions
-        for explosion in self.explosions:
-            for i in range(explosion['radius']):
-                angle = random.uniform(0, math.pi * 2)
-                x = explosion['x'] + math.cos(angle) * i
-                y = explosion['y'] + math.sin(angle) * i
-                pyxel.pset(x, y, random.choice([8, 9, 10]))
+        explosions = self.explosions
+        for ex, ey, radius, variant in zip(explosions['x'].tolist(), explosions['y'].tolist(),
+                                           explosions['radius'].tolist(),
+                                           explosions['variant'].tolist()):
+            self.explosion_atlas.draw(ex, ey, radius, variant)
+        self.profiler.lap("draw_explosions")
         
         # Draw particles
-        for particle in self.particles:
-            alpha = particle.life / particle.max_life
-            if alpha > 0.5:
-                pyxel.pset(particle.x, particle.y, particle.color)
+        self.particles.draw()
+        self.profiler.lap("draw_particles")
         
         # Reset camera
         pyxel.camera()
@@ -691,12 +1456,14 @@ class UltimatePyxelGame:
         pyxel.text(5, 25, f"Defeated: {self.enemies_defeated}/10", 7)
         if self.boss_active:
             pyxel.text(5, 35, "BOSS FIGHT!", 8)
+        if self.quality.notice_frames:
+            pyxel.text(5, 184, self.quality.notice, 6)  # Below the profiler overlay
+        self.profiler.lap("draw_ui")
         
         # Mini-map
-        pyxel.rectb(200, 5, 50, 40, 7)
-        for enemy in self.enemies:
-            pyxel.pset(200 + enemy['x'] // 5, 5 + enemy['y'] // 5, 8)
-        pyxel.pset(200 + self.player['x'] // 5, 5 + self.player['y'] // 5, 11)
+        self.minimap.draw(self.enemies['x'], self.enemies['y'],
+                          self.player['x'], self.player['y'])
+        self.profiler.lap("draw_minimap")
     
     def draw_gameover(self):
         pyxel.cls(0)
@@ -704,4 +1471,11 @@ class UltimatePyxelGame:
         pyxel.text(85, 100, f"Final Score: {self.score}", 7)
         pyxel.text(85, 120, "Press R to restart", 12)
 
-UltimatePyxelGame()
\ No newline at end of file
+if __name__ == "__main__":
+    # DEMO_SEED=<int> replays the same random run; DEMO_QUALITY=<tier> fixes the quality
+    seed = os.environ.get("DEMO_SEED")
+    quality = os.environ.get("DEMO_QUALITY") or None
+    if quality is not None and quality not in [tier['name'] for tier in QUALITY_TIERS]:
+        raise SystemExit(f"DEMO_QUALITY must be one of: "
+                         f"{', '.join(tier['name'] for tier in QUALITY_TIERS)}")
+    UltimatePyxelGame(seed=int(seed) if seed else None, quality=quality)
\ No newline at end of file
@@ -0,0 +1,158 @@
+# -----------------------------------------------------------------------------
+# File:    demo_bench.py
+# Project: FIT2 2025
+#
+# Description:
+#  Headless benchmark for the entity updates of demo.py. Measures the
+#  per-frame cost of update_bullets, update_enemies and update_powerups with
+#  the typed entity stores ("after") against the original dict-and-list code
+#  ("before", kept below as reference implementations), then the boss frame
+#  cost at bullet-hell density with a dense spinning bullet pattern.
+#
+# Usage:
+#   python demo_bench.py [N ...]    (N = entities of each kind, default 100 1000 5000)
+#
+# Dependencies:
+#   - pyxel, numpy
+#
+# License:
+#   MIT License
+# -----------------------------------------------------------------------------
+
+import math
+import random
+import sys
+import time
+
+from demo import (UltimatePyxelGame, BulletPattern, BULLET_PLAYER, BULLET_ENEMY,
+                  ENEMY_NORMAL, ENEMY_SINE, ENEMY_SPIRAL)
+
+FRAMES = 60  # Frames timed per measurement
+# Bullet-hell pattern: 48 emitters every frame, slow bullets (5,000+ on screen)
+DENSE_PATTERN = {'name': 'dense', 'emitters': 48, 'step': math.pi * 2 / 48, 'spin': 0.05,
+                 'speed': 1, 'cadence': 1}
+ENEMY_TYPE_NAMES = {ENEMY_NORMAL: 'normal', ENEMY_SINE: 'sine', ENEMY_SPIRAL: 'spiral'}
+
+
+# --- Original dict/list implementations (before) ------------------------------
+
+def legacy_update_bullets(bullets):
+    for bullet in bullets[:]:
+        bullet['x'] += bullet['vx']
+        bullet['y'] += bullet['vy']
+        if bullet['y'] < -10 or bullet['y'] > 202 or bullet['x'] < -10 or bullet['x'] > 266:
+            bullets.remove(bullet)
+
+def legacy_update_enemies(enemies, bullets):
+    for enemy in enemies[:]:
+        if enemy['type'] == 'sine':
+            enemy['y'] += enemy['speed']
+            enemy['x'] += math.sin(enemy['y'] * 0.1) * 2
+        elif enemy['type'] == 'spiral':
+            enemy['angle'] += 0.1
+            enemy['x'] += math.cos(enemy['angle']) * 2
+            enemy['y'] += enemy['speed']
+        else:
+            enemy['y'] += enemy['speed']
+            enemy['x'] += enemy.get('vx', 0)
+        if random.randint(0, 120) == 0:
+            bullets.append({'x': enemy['x'], 'y': enemy['y'] + 8, 'vx': 0, 'vy': 3,
+                            'type': 'enemy'})
+        if enemy['y'] > 200:
+            enemies.remove(enemy)
+
+def legacy_update_powerups(powerups):
+    for powerup in powerups[:]:
+        powerup['y'] += 2
+        powerup['angle'] += 0.2
+        if powerup['y'] > 200:
+            powerups.remove(powerup)
+
+
+# --- Workload -----------------------------------------------------------------
+
+def make_entities(n, seed=1):
+    """Identical starting entities for both implementations (tuples of plain values)"""
+    rng = random.Random(seed)
+    bullets = [(rng.uniform(0, 256), rng.uniform(0, 192), rng.uniform(-2, 2),
+                rng.choice([-8, 3, 4]), rng.choice([BULLET_PLAYER, BULLET_ENEMY]))
+               for _ in range(n)]
+    enemies = [(rng.uniform(20, 236), rng.uniform(-10, 60), rng.uniform(1, 3),
+                rng.choice([ENEMY_NORMAL, ENEMY_SINE, ENEMY_SPIRAL]), rng.uniform(-1, 1))
+               for _ in range(n)]
+    powerups = [(rng.uniform(0, 256), rng.uniform(0, 60)) for _ in range(n)]
+    return bullets, enemies, powerups
+
+def time_frames(update):
+    """Average milliseconds per call over FRAMES calls"""
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        update()
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+def bench_before(n):
+    bullets, enemies, powerups = make_entities(n)
+    bullet_list = [{'x': x, 'y': y, 'vx': vx, 'vy': vy,
+                    'type': 'player' if owner == BULLET_PLAYER else 'enemy'}
+                   for x, y, vx, vy, owner in bullets]
+    enemy_list = [{'x': x, 'y': y, 'speed': speed, 'type': ENEMY_TYPE_NAMES[kind], 'angle': 0,
+                   'vx': vx if kind == ENEMY_NORMAL else 0}
+                  for x, y, speed, kind, vx in enemies]
+    powerup_list = [{'x': x, 'y': y, 'angle': 0} for x, y in powerups]
+    return (time_frames(lambda: legacy_update_bullets(bullet_list)),
+            time_frames(lambda: legacy_update_enemies(enemy_list, bullet_list)),
+            time_frames(lambda: legacy_update_powerups(powerup_list)))
+
+def bench_after(n):
+    bullets, enemies, powerups = make_entities(n)
+    game = UltimatePyxelGame(headless=True, seed=1)
+    for x, y, vx, vy, owner in bullets:
+        game.bullets.add(x=x, y=y, vx=vx, vy=vy, owner=owner)
+    for x, y, speed, kind, vx in enemies:
+        game.add_enemy(x=x, y=y, speed=speed, enemy_type=kind,
+                       vx=vx if kind == ENEMY_NORMAL else 0)
+    for x, y in powerups:
+        game.powerups.add(x=x, y=y, angle=0)
+    
+    def update_enemies():
+        game.frame += 1  # Clock of the scheduled enemy fire
+        game.update_enemies()
+    
+    return (time_frames(game.update_bullets),
+            time_frames(update_enemies),
+            time_frames(game.update_powerups))
+
+def bench_boss(warmup=300):
+    """Milliseconds per frame of boss + bullet + collision updates at bullet-hell density"""
+    game = UltimatePyxelGame(headless=True, seed=1)
+    game.spawn_boss()
+    game.boss['health'] = game.boss['max_health'] = 10 ** 9
+    game.boss_patterns = [BulletPattern(**DENSE_PATTERN)]
+    
+    def update_boss():
+        game.frame += 1  # Clock of the scheduled boss volleys
+        game.update_boss()
+    
+    def frame():
+        update_boss()
+        game.update_bullets()
+        game.check_collisions()
+        game.player['health'] = 100  # Keep the player alive while bullets hit
+    
+    for _ in range(warmup):
+        frame()
+    return len(game.bullets), time_frames(update_boss), time_frames(frame)
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000]
+    print(f"{'entities':>8}  {'method':<16}{'before ms':>10}{'after ms':>10}{'speedup':>9}")
+    for n in sizes:
+        before = bench_before(n)
+        after = bench_after(n)
+        for name, b, a in zip(("update_bullets", "update_enemies", "update_powerups"),
+                              before, after):
+            print(f"{n:>8}  {name:<16}{b:10.4f}{a:10.4f}{b / a:8.1f}x")
+    
+    bullets, boss_ms, frame_ms = bench_boss()
+    print(f"\nboss pattern '{DENSE_PATTERN['name']}': {bullets} enemy bullets, "
+          f"update_boss {boss_ms:.4f} ms, boss+bullets+collisions {frame_ms:.4f} ms per frame")
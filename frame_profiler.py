@@ -0,0 +1,163 @@
+# -----------------------------------------------------------------------------
+# File:    frame_profiler.py
+# Project: FIT2 2025
+#
+# Description:
+#  Opt-in per-phase frame profiler shared by the Pyxel games in this folder
+#  (space_invader.py, demo.py, b15-8.py).
+#
+# Usage:
+#   FRAME_PROFILE=1 pyxel run demo.py
+#
+#   In the game code:
+#     profiler = FrameProfiler("demo")
+#     profiler.start()               # beginning of update() / draw()
+#     ...player logic...
+#     profiler.lap("player")         # time since start() or the previous lap()
+#     ...
+#     profiler.update()              # F1 toggles the overlay
+#     profiler.draw_overlay()        # last thing drawn
+#
+#  Each phase keeps its most recent samples in a fixed-size ring buffer.
+#  F1 shows p50/p95/p99 (milliseconds) on screen, and the samples are written
+#  to <name>_profile.csv when the game exits. A table taller than the screen
+#  is split into pages; F1 steps through them before hiding the overlay.
+#
+# Environment variables:
+#   FRAME_PROFILE      Enable profiling when set to anything but "" or "0"
+#   FRAME_PROFILE_CSV  CSV output path (default: <name>_profile.csv)
+#
+# License:
+#   MIT License
+# -----------------------------------------------------------------------------
+
+import atexit  # Write the CSV when the game exits
+import csv     # CSV export
+import os      # Environment variables
+import time    # High resolution timer
+from array import array  # Compact ring buffers of doubles
+
+import pyxel
+
+DEFAULT_CAPACITY = 600  # Samples kept per phase (10 seconds at 60 fps)
+
+
+class PhaseBuffer:
+    """Fixed-size ring buffer of timings (seconds) for one phase"""
+
+    def __init__(self, capacity):
+        self.samples = array('d', bytes(8 * capacity))
+        self.capacity = capacity
+        self.count = 0  # Total samples ever recorded
+
+    def add(self, seconds):
+        self.samples[self.count % self.capacity] = seconds
+        self.count += 1
+
+    def ordered(self):
+        """Stored samples, oldest first"""
+        if self.count <= self.capacity:
+            return list(self.samples[:self.count])
+        start = self.count % self.capacity
+        return list(self.samples[start:]) + list(self.samples[:start])
+
+    def percentiles(self, *ps):
+        """Nearest-rank percentiles of the stored samples (seconds)"""
+        values = sorted(self.ordered())
+        if not values:
+            return [0.0 for _ in ps]
+        last = len(values) - 1
+        return [values[min(last, int(p / 100 * len(values)))] for p in ps]
+
+
+class FrameProfiler:
+    """Collect per-phase frame timings, show them on screen and dump them as CSV"""
+
+    def __init__(self, name, capacity=DEFAULT_CAPACITY, enabled=None,
+                 csv_path=None, toggle_key=pyxel.KEY_F1):
+        """
+        Args:
+            name: Game name, used for the default CSV file name
+            capacity: Samples kept per phase
+            enabled: Force profiling on/off (default: FRAME_PROFILE variable)
+            csv_path: Output path (default: FRAME_PROFILE_CSV or <name>_profile.csv)
+            toggle_key: Key that shows/hides the overlay
+        """
+        if enabled is None:
+            enabled = os.environ.get("FRAME_PROFILE", "") not in ("", "0")
+        self.enabled = enabled
+        self.capacity = capacity
+        self.csv_path = (csv_path or os.environ.get("FRAME_PROFILE_CSV")
+                         or f"{name}_profile.csv")
+        self.toggle_key = toggle_key
+        self.show_overlay = False
+        self.page = 0       # Overlay page shown
+        self.page_count = 1  # Pages the last drawn overlay needed
+        self.phases = {}    # Phase name -> PhaseBuffer (in first-seen order)
+        self.mark = 0.0     # Time of the last start()/lap()
+        self.dumped = False
+        if enabled:
+            atexit.register(self.close)
+
+    def start(self):
+        """Start timing a new sequence of phases"""
+        if self.enabled:
+            self.mark = time.perf_counter()
+
+    def lap(self, phase):
+        """Record the time since start() or the previous lap() under the given phase"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        buffer = self.phases.get(phase)
+        if buffer is None:
+            buffer = self.phases[phase] = PhaseBuffer(self.capacity)
+        buffer.add(now - self.mark)
+        self.mark = now
+
+    def update(self):
+        """Show the overlay, step through its pages and hide it with the toggle key"""
+        if self.enabled and pyxel.btnp(self.toggle_key):
+            if self.show_overlay and self.page + 1 < self.page_count:
+                self.page += 1
+            else:
+                self.show_overlay = not self.show_overlay
+                self.page = 0
+
+    def draw_overlay(self, x=2, y=2, col=7):
+        """Draw a p50/p95/p99 table (milliseconds) for every phase"""
+        if not (self.enabled and self.show_overlay):
+            return
+        line_height = pyxel.FONT_HEIGHT + 1
+        # Phases per page: as many rows as fit between y and the bottom of the screen
+        per_page = max(1, (pyxel.height - y - 2) // line_height - 1)
+        self.page_count = max(1, -(-len(self.phases) // per_page))
+        self.page = min(self.page, self.page_count - 1)
+        phases = list(self.phases.items())[self.page * per_page:(self.page + 1) * per_page]
+        title = "phase" if self.page_count == 1 else f"phase {self.page + 1}/{self.page_count}"
+        pyxel.rect(x, y, 37 * pyxel.FONT_WIDTH, (len(phases) + 1) * line_height + 2, 0)
+        pyxel.text(x + 1, y + 1, f"{title:<16}{'p50':>7}{'p95':>7}{'p99':>7}", col)
+        for i, (phase, buffer) in enumerate(phases):
+            p50, p95, p99 = buffer.percentiles(50, 95, 99)
+            pyxel.text(x + 1, y + 1 + (i + 1) * line_height,
+                       f"{phase[:16]:<16}{p50 * 1000:7.3f}{p95 * 1000:7.3f}{p99 * 1000:7.3f}",
+                       col)
+
+    def dump_csv(self, path=None):
+        """Write the stored samples (milliseconds) with one column per phase"""
+        path = path or self.csv_path
+        columns = [buffer.ordered() for buffer in self.phases.values()]
+        rows = max((len(column) for column in columns), default=0)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["sample"] + list(self.phases))
+            for i in range(rows):
+                writer.writerow([i] + [f"{column[i] * 1000:.4f}" if i < len(column) else ""
+                                       for column in columns])
+        return path
+
+    def close(self):
+        """Dump the CSV once (called on exit; safe to call again)"""
+        if self.enabled and not self.dumped and self.phases:
+            self.dumped = True
+            print(f"Frame profile written to {self.dump_csv()}")
@@ -1,7 +1,21 @@
 # Created by Kyopan
 
+import argparse
+import atexit
+import gc
+import hashlib
+import json
+import math
+import os
+import time
+import tracemalloc
+from itertools import islice
+
+import numpy as np
 import pyxel
 
+from frame_profiler import FrameProfiler
+
 # Definition of screen size and constants used in the game
 SCREEN_WIDTH  = 512
 SCREEN_HEIGHT = 512
@@ -19,97 +33,522 @@ ENEMY_WIDTH   = 8
 ENEMY_HEIGHT  = 8
 ENEMY_COLOR   = 10  # Enemy alien color (10: yellow)
 
+# Fixed simulation timestep
+# The game logic always advances in ticks of TICK_DT seconds, no matter how
+# often Pyxel manages to call update/draw. If a frame arrives late, several
+# ticks are run to catch up; if it is very late, the backlog is dropped after
+# MAX_CATCHUP_TICKS so a slow machine skips rendered frames instead of slowing
+# the game down (or falling further and further behind).
+TICK_RATE         = 60  # Simulation ticks per second
+TICK_DT           = 1 / TICK_RATE
+MAX_CATCHUP_TICKS = 8   # Most ticks run for a single rendered frame
+
 # Enemy movement speed and drop distance
-ENEMY_X_SPEED = 2    # Enemy horizontal movement speed
+ENEMY_X_SPEED = 2    # Enemy horizontal movement speed (pixels per tick)
 ENEMY_DROP    = 10   # Distance (in pixels) enemies drop when they reach the edge
 
-BULLET_SPEED  = 4    # Bullet movement speed (pixels per frame moving upwards)
+BULLET_SPEED  = 4    # Bullet movement speed (pixels per tick moving upwards)
+
+# Enemy waves
+# Waves are read from WAVES_PATH (see assets/waves.json); DEFAULT_WAVE is the
+# original hard-coded 5x3 formation and fills in any key a wave leaves out.
+# speed_curve is a list of [remaining fraction, speed] pairs: the last pair
+# whose fraction is >= the fraction of enemies still alive sets the speed.
+WAVES_PATH   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "waves.json")
+DEFAULT_WAVE = {
+    "cols": 5, "rows": 3,               # Number of enemy columns and rows
+    "start_x": 60, "start_y": 60,       # Top-left coordinate of the first enemy
+    "spacing_x": 30, "spacing_y": 20,   # Horizontal and vertical spacing
+    "drop": ENEMY_DROP,                 # Drop distance at the screen edge
+    "speed_curve": [[1.0, ENEMY_X_SPEED]],
+}
+
+def load_waves(path: str = WAVES_PATH):
+    """Read the wave list from a JSON file"""
+    with open(path) as f:
+        waves = json.load(f)["waves"]
+    return [{**DEFAULT_WAVE, **wave} for wave in waves]
+
+def waves_digest(waves) -> bytes:
+    """Short fingerprint of a wave list (stored in input logs)"""
+    text = json.dumps(waves, sort_keys=True).encode("ascii")
+    return hashlib.sha1(text).digest()[:WAVES_DIGEST_SIZE]
+
+def wave_speed(wave, alive_fraction: float) -> int:
+    """Horizontal enemy speed for the given fraction of enemies still alive"""
+    speed = wave["speed_curve"][0][1]
+    for fraction, value in wave["speed_curve"]:
+        if fraction >= alive_fraction:
+            speed = value
+    return speed
+
+# Firing modes
+# max_bullets: how many player bullets may be on screen at once
+# spread:      horizontal speed of each bullet fired per shot
+# repeat:      auto-fire interval in frames while the button is held (0 = click only)
+FIRE_MODES = {
+    "single": {"max_bullets": 1,   "spread": [0],        "repeat": 0},
+    "rapid":  {"max_bullets": 64,  "spread": [0],        "repeat": 4},
+    "spread": {"max_bullets": 192, "spread": [-1, 0, 1], "repeat": 8},
+}
+
+# Input for a single frame
+# The game only reads input through this snapshot, so it can be fed from the
+# real mouse/keyboard or from a script when running without a window.
+class FrameInput:
+    __slots__ = ("mouse_x", "fire", "restart", "quit")
+
+    def __init__(self, mouse_x: int = 0, fire: bool = False,
+                 restart: bool = False, quit: bool = False):
+        self.mouse_x = mouse_x  # Mouse X coordinate
+        self.fire = fire        # Left mouse button was pressed this frame
+        self.restart = restart  # R key was pressed this frame
+        self.quit = quit        # Q key was pressed this frame
+
+    def merge(self, earlier):
+        # Keep presses from an earlier frame that no simulation tick has consumed yet
+        if earlier is not None:
+            self.fire = self.fire or earlier.fire
+            self.restart = self.restart or earlier.restart
+            self.quit = self.quit or earlier.quit
+        return self
+
+    def held(self):
+        # Same mouse position without the one-shot presses (for catch-up ticks)
+        return FrameInput(self.mouse_x)
+
+# Input provider reading the real mouse and keyboard through Pyxel
+class PyxelInput:
+    def __init__(self, fire_repeat: int = 0):
+        # Auto-fire interval while the button is held (0 = one shot per click)
+        self.fire_repeat = fire_repeat
+
+    def poll(self) -> FrameInput:
+        return FrameInput(pyxel.mouse_x,
+                          pyxel.btnp(pyxel.MOUSE_BUTTON_LEFT,
+                                     hold=self.fire_repeat, repeat=self.fire_repeat),
+                          pyxel.btnp(pyxel.KEY_R),
+                          pyxel.btnp(pyxel.KEY_Q))
+
+# Input provider for headless runs
+# Sweeps the ship across the screen, fires at a fixed interval and restarts
+# immediately after a game over so the simulation never stalls.
+class ScriptedInput:
+    def __init__(self, fire_every: int = 8, sweep_speed: int = 3):
+        self.fire_every = fire_every    # Fire once every N frames
+        self.sweep_speed = sweep_speed  # Mouse movement (pixels per frame)
+        self.frame = 0
+
+    def poll(self) -> FrameInput:
+        # Triangle wave between the left and right edges of the screen
+        period = 2 * SCREEN_WIDTH
+        phase = (self.frame * self.sweep_speed) % period
+        mouse_x = phase if phase < SCREEN_WIDTH else period - phase
+        fire = self.frame % self.fire_every == 0
+        self.frame += 1
+        return FrameInput(mouse_x, fire, restart=True)
+
+# Input log format (recording and replay)
+# Header: INPUT_LOG_MAGIC, version byte, length-prefixed fire mode name,
+#         waves_digest() of the waves the session was played with.
+# Then one entry per simulation tick:
+#   byte: bit 0 fire, bit 1 restart, bit 2 quit,
+#         bits 3-7 mouse_x delta + 15 when the delta is within -15..15,
+#         or 31 followed by the delta as a zigzag varint.
+# A tick where the mouse moves less than 16 pixels costs a single byte.
+INPUT_LOG_MAGIC   = b"SIRP"
+INPUT_LOG_VERSION = 2
+WAVES_DIGEST_SIZE = 8
+SMALL_DELTA       = 15
+ESCAPE_DELTA      = 31
+
+# Records the input of every simulation tick into a compact binary log
+class InputRecorder:
+    def __init__(self, path: str, fire_mode: str, waves):
+        self.path = path
+        self.data = bytearray(INPUT_LOG_MAGIC)
+        self.data.append(INPUT_LOG_VERSION)
+        name = fire_mode.encode("ascii")
+        self.data.append(len(name))
+        self.data += name
+        self.data += waves_digest(waves)
+        self.last_mouse_x = 0
+        self.frames = 0
+
+    def record(self, inputs: FrameInput):
+        flags = int(inputs.fire) | int(inputs.restart) << 1 | int(inputs.quit) << 2
+        delta = inputs.mouse_x - self.last_mouse_x
+        self.last_mouse_x = inputs.mouse_x
+        if -SMALL_DELTA <= delta <= SMALL_DELTA:
+            self.data.append(flags | (delta + SMALL_DELTA) << 3)
+        else:
+            self.data.append(flags | ESCAPE_DELTA << 3)
+            # Zigzag encoding keeps small negative numbers small
+            value = delta * 2 if delta >= 0 else -delta * 2 - 1
+            while value >= 0x80:
+                self.data.append(value & 0x7F | 0x80)
+                value >>= 7
+            self.data.append(value)
+        self.frames += 1
+
+    def save(self):
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+
+# Input provider that plays back a log written by InputRecorder
+# Once the log runs out it requests quit, which ends Game.step(). A record cut
+# off at the end (e.g. a log truncated mid-varint) also counts as the end.
+class ReplayInput:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        if len(self.data) < 6 or self.data[:5] != INPUT_LOG_MAGIC + bytes([INPUT_LOG_VERSION]):
+            raise ValueError(f"{path} is not a version {INPUT_LOG_VERSION} input log")
+        length = self.data[5]
+        if len(self.data) < 6 + length + WAVES_DIGEST_SIZE:
+            raise ValueError(f"{path} has a truncated header")
+        self.fire_mode = self.data[6:6 + length].decode("ascii")
+        self.pos = 6 + length + WAVES_DIGEST_SIZE
+        self.waves_digest = self.data[6 + length:self.pos]
+        self.mouse_x = 0
+
+    def poll(self) -> FrameInput:
+        if self.pos >= len(self.data):
+            return FrameInput(self.mouse_x, quit=True)
+        byte = self.data[self.pos]
+        self.pos += 1
+        delta = byte >> 3
+        if delta == ESCAPE_DELTA:
+            value = shift = 0
+            while True:
+                if self.pos >= len(self.data):
+                    return FrameInput(self.mouse_x, quit=True)
+                part = self.data[self.pos]
+                self.pos += 1
+                value |= (part & 0x7F) << shift
+                shift += 7
+                if part < 0x80:
+                    break
+            delta = value >> 1 if value % 2 == 0 else -(value + 1 >> 1)
+        else:
+            delta -= SMALL_DELTA
+        self.mouse_x += delta
+        return FrameInput(self.mouse_x, bool(byte & 1), bool(byte & 2), bool(byte & 4))
 
 # Player (ship) class
 class Player:
+    # __slots__: no per-instance __dict__ (less memory, faster attribute access)
+    __slots__ = ("x", "y", "prev_x", "w", "h", "color")
+
     def __init__(self, x: int, y: int):
         self.x = x  # Spaceship's top-left X coordinate
         self.y = y  # Spaceship's top-left Y coordinate
+        self.prev_x = x  # X coordinate at the previous tick (for interpolation)
         self.w = PLAYER_WIDTH
         self.h = PLAYER_HEIGHT
         self.color = PLAYER_COLOR
 
-    def update(self):
+    def update(self, mouse_x: int):
         # Move the player position based on mouse X coordinate (adjusted to center on cursor)
-        target_x = pyxel.mouse_x - self.w // 2
+        target_x = mouse_x - self.w // 2
         # Adjust position to stay within the screen
         if target_x < 0:
             target_x = 0
-        if target_x > pyxel.width - self.w:
-            target_x = pyxel.width - self.w
+        if target_x > SCREEN_WIDTH - self.w:
+            target_x = SCREEN_WIDTH - self.w
         self.x = target_x
         # ※ Y coordinate is fixed (no vertical movement)
 
-    def draw(self):
+    def draw(self, alpha: float = 1.0):
         # Draw the spaceship as a triangle (base down, apex up)
-        x1 = self.x
+        # alpha interpolates between the previous and the current tick
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        x1 = x
         y1 = self.y + self.h  # Y coordinate of the base (bottom of the spaceship)
-        x2 = self.x + self.w
+        x2 = x + self.w
         y2 = self.y + self.h  # Right side of the base
-        x3 = self.x + self.w // 2
+        x3 = x + self.w // 2
         y3 = self.y           # Apex (tip of the spaceship)
         pyxel.tri(x1, y1, x2, y2, x3, y3, self.color)
 
 # Class representing a bullet
 class Bullet:
-    def __init__(self, x: int, y: int):
-        self.x = x  # Bullet's top-left X coordinate
-        self.y = y  # Bullet's top-left Y coordinate
+    __slots__ = ("x", "y", "vx", "prev_x", "prev_y", "w", "h", "color", "active")
+
+    def __init__(self, x: int = 0, y: int = 0, vx: int = 0):
         self.w = BULLET_WIDTH
         self.h = BULLET_HEIGHT
         self.color = BULLET_COLOR
+        self.reset(x, y, vx)
+
+    def reset(self, x: int, y: int, vx: int = 0):
+        # (Re)launch the bullet; pooled bullets are reused through this method
+        self.x = x  # Bullet's top-left X coordinate
+        self.y = y  # Bullet's top-left Y coordinate
+        self.vx = vx  # Horizontal speed (used by the spread mode)
+        self.prev_x = x  # Position at the previous tick (for interpolation)
+        self.prev_y = y
         self.active = True  # Flag indicating if the bullet is active
 
     def update(self):
         # Move the bullet upwards
+        self.x += self.vx
         self.y -= BULLET_SPEED
         # Deactivate if it goes off-screen
-        if self.y + self.h < 0:
+        if self.y + self.h < 0 or self.x + self.w < 0 or self.x >= SCREEN_WIDTH:
             self.active = False
 
-    def draw(self):
-        # Draw the bullet as a rectangle
-        pyxel.rect(self.x, self.y, self.w, self.h, self.color)
-
-# Class for enemy aliens
-class Enemy:
-    def __init__(self, x: int, y: int):
-        self.x = x  # Enemy's top-left X coordinate
-        self.y = y  # Enemy's top-left Y coordinate
+    def draw(self, alpha: float = 1.0):
+        # Draw the bullet as a rectangle at its interpolated position
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        pyxel.rect(x, y, self.w, self.h, self.color)
+
+# Preallocated bullets, recycled through their active flag
+# The active bullets are always bullets[:count], so firing and removing a
+# bullet never allocate a new object or list during play.
+class BulletPool:
+    __slots__ = ("bullets", "count")
+
+    def __init__(self, capacity: int):
+        self.bullets = [Bullet() for _ in range(capacity)]
+        for bullet in self.bullets:
+            bullet.active = False
+        self.count = 0  # Number of active bullets
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # Active bullets only
+        return islice(self.bullets, self.count)
+
+    def spawn(self, x: int, y: int, vx: int = 0):
+        # Activate the next free bullet (None when the pool is exhausted)
+        if self.count == len(self.bullets):
+            return None
+        bullet = self.bullets[self.count]
+        bullet.reset(x, y, vx)
+        self.count += 1
+        return bullet
+
+    def release_inactive(self):
+        # Move bullets that went off-screen or hit an enemy behind the active ones
+        bullets = self.bullets
+        i = 0
+        while i < self.count:
+            if bullets[i].active:
+                i += 1
+            else:
+                # Swap with the last active bullet (order is not significant)
+                self.count -= 1
+                bullets[i], bullets[self.count] = bullets[self.count], bullets[i]
+
+# Index of which lattice rows/columns of the formation are still occupied
+# Alive counts per column and per row are only updated when an enemy dies,
+# so the leftmost, rightmost and lowest occupied lattice positions are always
+# available in O(1) instead of scanning every enemy each frame.
+class FormationIndex:
+    __slots__ = ("col_counts", "row_counts", "left_col", "right_col", "bottom_row")
+
+    def __init__(self, cols: int, rows: int):
+        self.col_counts = [rows] * cols  # Alive enemies in each column
+        self.row_counts = [cols] * rows  # Alive enemies in each row
+        self.left_col = 0          # Leftmost occupied column
+        self.right_col = cols - 1  # Rightmost occupied column
+        self.bottom_row = rows - 1  # Lowest occupied row
+
+    def remove(self, col: int, row: int):
+        # Record the death of the enemy at (col, row) and shrink the bounds if needed
+        self.col_counts[col] -= 1
+        self.row_counts[row] -= 1
+        # Each boundary only ever moves inwards, so the scans below cost
+        # O(cols + rows) in total over a whole wave
+        while self.left_col <= self.right_col and self.col_counts[self.left_col] == 0:
+            self.left_col += 1
+        while self.right_col >= self.left_col and self.col_counts[self.right_col] == 0:
+            self.right_col -= 1
+        while self.bottom_row >= 0 and self.row_counts[self.bottom_row] == 0:
+            self.bottom_row -= 1
+
+# Formation of enemy aliens
+# Every enemy lives in contiguous NumPy arrays (alive, row, col). Positions are
+# not stored: enemy (col, row) sits at origin + (col, row) * spacing, so
+# stepping and dropping only move the origin, in O(1) whatever the size.
+class Formation:
+    def __init__(self, cols: int, rows: int, start_x: int, start_y: int,
+                 spacing_x: int, spacing_y: int):
+        self.cols = cols  # Number of enemy columns
+        self.rows = rows  # Number of enemy rows
         self.w = ENEMY_WIDTH
         self.h = ENEMY_HEIGHT
         self.color = ENEMY_COLOR
-        self.alive = True  # Alive flag
-
-    def draw(self):
-        # Draw the enemy as a rectangle
-        pyxel.rect(self.x, self.y, self.w, self.h, self.color)
+        self.spacing_x = spacing_x
+        self.spacing_y = spacing_y
+        # Top-left coordinate of lattice position (col 0, row 0); moves with the formation
+        self.origin_x = start_x
+        self.origin_y = start_y
+        # Origin at the previous tick (for interpolation)
+        self.prev_origin_x = start_x
+        self.prev_origin_y = start_y
+        # Lattice position of each enemy (row-major: row 0 left to right, then row 1, ...)
+        self.row = np.repeat(np.arange(rows, dtype=np.int32), cols)
+        self.col = np.tile(np.arange(cols, dtype=np.int32), rows)
+        self.alive = np.ones(rows * cols, dtype=bool)  # Alive flags
+        self.total = rows * cols  # Number of enemies at the start of the wave
+        self.count = rows * cols  # Number of enemies still alive
+        self.index = FormationIndex(cols, rows)
+        # Pre-rendered picture of the alive formation (lattice cell (0, 0) at its
+        # top-left corner). It is created on the first draw and only patched
+        # when enemies die, so drawing it is a single blt.
+        self.image = None
+        self.image_w = (cols - 1) * spacing_x + self.w
+        self.image_h = (rows - 1) * spacing_y + self.h
+        self.killed = []  # Enemies defeated since the image was last patched
+
+    def __len__(self):
+        return self.count
+
+    def step(self, dx: int):
+        # Move the whole formation horizontally
+        self.origin_x += dx
+
+    def drop(self, dy: int):
+        # Move the whole formation down
+        self.origin_y += dy
+
+    def bounds(self):
+        # Leftmost X and rightmost X (right edge included) of the alive enemies
+        min_x = self.origin_x + self.index.left_col * self.spacing_x
+        max_x = self.origin_x + self.index.right_col * self.spacing_x + self.w
+        return min_x, max_x
+
+    def bottom(self):
+        # Lowest Y (bottom edge included) of the alive enemies
+        return self.origin_y + self.index.bottom_row * self.spacing_y + self.h
+
+    def hit_test(self, x: int, y: int, w: int, h: int) -> int:
+        # Index of the first alive enemy overlapping the given rectangle, or -1
+        # Broadphase: the formation is a uniform grid, so the lattice cells the
+        # rectangle can touch follow directly from its position. Enemy (col, row)
+        # covers [origin + col * spacing, origin + col * spacing + size) on each axis.
+        rel_x = x - self.origin_x
+        rel_y = y - self.origin_y
+        col_lo = max((rel_x - self.w) // self.spacing_x + 1, 0)
+        col_hi = min((rel_x + w - 1) // self.spacing_x, self.cols - 1)
+        row_lo = max((rel_y - self.h) // self.spacing_y + 1, 0)
+        row_hi = min((rel_y + h - 1) // self.spacing_y, self.rows - 1)
+        # Usually one or two cells remain; only their alive flags need checking
+        for row in range(row_lo, row_hi + 1):
+            base = row * self.cols
+            for col in range(col_lo, col_hi + 1):
+                if self.alive[base + col]:
+                    return base + col
+        return -1
+
+    def kill(self, index: int):
+        # Mark the enemy at the given index as defeated
+        self.alive[index] = False
+        self.count -= 1
+        self.index.remove(int(self.col[index]), int(self.row[index]))
+        self.killed.append(index)
+
+    def render(self):
+        # Draw every alive enemy into the cached image (color 0 is transparent)
+        self.image.cls(0)
+        for i in np.flatnonzero(self.alive):
+            self.image.rect(int(self.col[i]) * self.spacing_x, int(self.row[i]) * self.spacing_y,
+                            self.w, self.h, self.color)
+        self.killed.clear()
+
+    def patch(self):
+        # Erase the enemies defeated since the last draw from the cached image
+        if self.spacing_x < self.w or self.spacing_y < self.h:
+            # Enemies overlap, so erasing one would also erase part of its neighbors
+            self.render()
+            return
+        for i in self.killed:
+            self.image.rect(int(self.col[i]) * self.spacing_x, int(self.row[i]) * self.spacing_y,
+                            self.w, self.h, 0)
+        self.killed.clear()
+
+    def draw(self, alpha: float = 1.0):
+        # Draw the whole formation with one blt of the cached image, at the
+        # origin interpolated between the previous and the current tick
+        if self.image is None:
+            self.image = pyxel.Image(self.image_w, self.image_h)
+            self.render()
+        elif self.killed:
+            self.patch()
+        x = self.prev_origin_x + (self.origin_x - self.prev_origin_x) * alpha
+        y = self.prev_origin_y + (self.origin_y - self.prev_origin_y) * alpha
+        pyxel.blt(x, y, self.image, 0, 0, self.image_w, self.image_h, 0)
 
 # Class managing the entire game
 class Game:
-    def __init__(self):
-        # Initialize Pyxel
-        pyxel.init(SCREEN_WIDTH, SCREEN_HEIGHT)
-        pyxel.mouse(True)  # Show mouse cursor
-
-        # Sound and BGM settings
-        # Sound IDs:
-        # 0 = Bullet shot sound, 1 = Enemy defeat sound, 2 = Game over sound, 3 = BGM, 4 = Victory sound
-        pyxel.sounds[0].set("c4c3", "p", "66", "s", 10)  # High sound descending slightly to lower sound
-        pyxel.sounds[1].set("c1",  "n", "6",  "f", 10)   # Noise sound (explosion sound, fade-out effect)
-        pyxel.sounds[2].set("c2",  "t", "7",  "n", 30)   # Lower single note (for game over)
-        pyxel.sounds[3].set("c4e4g4e4", "p", "4444", "n", 15)  # Simple 4-note loop melody (BGM)
-        pyxel.sounds[4].set("c4c4", "p", "66", "n", 10)  # Ascending 2-note (for victory)
+    def __init__(self, headless: bool = False, input_provider=None,
+                 fire_mode: str = "single", recorder: InputRecorder = None,
+                 waves=None):
+        # In headless mode no window, sound or Pyxel main loop is created;
+        # the game is advanced explicitly with step()
+        self.headless = headless
+        self.fire_mode = FIRE_MODES[fire_mode]
+        self.waves = waves if waves is not None else load_waves()
+        if input_provider is None:
+            if headless:
+                input_provider = ScriptedInput()
+            else:
+                input_provider = PyxelInput(self.fire_mode["repeat"])
+        self.input = input_provider
+        self.recorder = recorder  # Records the input of every tick (optional)
+        self.quit_requested = False
+
+        # Fixed-timestep state
+        self.last_time = None      # Wall-clock time of the previous update
+        self.accumulator = 0.0     # Unsimulated time (seconds)
+        self.alpha = 1.0           # Interpolation factor used by draw()
+        self.pending_input = None  # Presses that arrived while no tick was due
+
+        # Per-phase timings (enable with FRAME_PROFILE=1, F1 toggles the overlay)
+        self.profiler = FrameProfiler("space_invader")
+
+        if not headless:
+            # Initialize Pyxel
+            pyxel.init(SCREEN_WIDTH, SCREEN_HEIGHT, fps=TICK_RATE)
+            pyxel.mouse(True)  # Show mouse cursor
+
+            # Sound and BGM settings
+            # Sound IDs:
+            # 0 = Bullet shot sound, 1 = Enemy defeat sound, 2 = Game over sound, 3 = BGM, 4 = Victory sound
+            pyxel.sounds[0].set("c4c3", "p", "66", "s", 10)  # High sound descending slightly to lower sound
+            pyxel.sounds[1].set("c1",  "n", "6",  "f", 10)   # Noise sound (explosion sound, fade-out effect)
+            pyxel.sounds[2].set("c2",  "t", "7",  "n", 30)   # Lower single note (for game over)
+            pyxel.sounds[3].set("c4e4g4e4", "p", "4444", "n", 15)  # Simple 4-note loop melody (BGM)
+            pyxel.sounds[4].set("c4c4", "p", "66", "n", 10)  # Ascending 2-note (for victory)
 
         # Initialize game state
         self.reset_game()
-        # Start Pyxel's main loop
-        pyxel.run(self.update, self.draw)
+        if not headless:
+            # Start Pyxel's main loop
+            pyxel.run(self.update, self.draw)
+
+    def play_sound(self, ch: int, snd: int, loop: bool = False):
+        # Play a sound unless running headless
+        if not self.headless:
+            pyxel.play(ch, snd, loop=loop)
+
+    def stop_sound(self):
+        # Stop all sounds unless running headless
+        if not self.headless:
+            pyxel.stop()
+
+    def step(self, n_frames: int = 1) -> int:
+        """Advance the game by n_frames ticks without drawing; returns frames run"""
+        for frame in range(n_frames):
+            if self.quit_requested:
+                return frame
+            self.tick(self.input.poll())
+        return n_frames
 
     def reset_game(self):
         """Reset state at game start/restart"""
@@ -118,142 +557,188 @@ class Game:
         player_start_y = SCREEN_HEIGHT - PLAYER_HEIGHT - 20  # Positioned 20 pixels above the bottom
         self.player = Player(player_start_x, player_start_y)
 
-        # Initial placement of enemy cluster (arranged in multiple rows and columns)
-        self.enemies = []
-        cols = 5   # Number of enemy columns
-        rows = 3   # Number of enemy rows
-        start_x = 60   # Top-left X coordinate of the first enemy
-        start_y = 60   # Top-left Y coordinate of the first enemy
-        spacing_x = 30  # Horizontal spacing
-        spacing_y = 20  # Vertical spacing
-        for j in range(rows):
-            for i in range(cols):
-                x = start_x + i * spacing_x
-                y = start_y + j * spacing_y
-                self.enemies.append(Enemy(x, y))
-        # No bullets exist initially
-        self.bullet = None
+        # No bullets exist initially (the pool holds every bullet the fire mode allows)
+        self.bullets = BulletPool(self.fire_mode["max_bullets"])
 
         # Reset score
         self.score = 0
 
-        # Current movement direction of enemies (1: right, -1: left)
-        self.enemy_direction = 1
+        # Place the enemy cluster of the first wave
+        self.start_wave(0)
 
         # Game over related flags
         self.game_over = False
         self.win = False
 
         # Start BGM playback (loop)
-        pyxel.play(3, 3, loop=True)
+        self.play_sound(3, 3, loop=True)
+
+    def start_wave(self, index: int):
+        """Place the enemy cluster of the given wave (arranged in multiple rows and columns)"""
+        self.wave_index = index
+        self.wave = wave = self.waves[index]
+        self.formation = Formation(wave["cols"], wave["rows"], wave["start_x"], wave["start_y"],
+                                   wave["spacing_x"], wave["spacing_y"])
+        self.enemy_speed = wave_speed(wave, 1.0)
+        # Current movement direction of enemies (1: right, -1: left)
+        self.enemy_direction = 1
 
     def update(self):
+        # Called by Pyxel once per rendered frame: run as many fixed ticks as
+        # the wall-clock time since the previous frame requires
+        now = time.perf_counter()
+        if self.last_time is None:
+            self.accumulator += TICK_DT
+        else:
+            self.accumulator += now - self.last_time
+        self.last_time = now
+
+        self.profiler.update()
+        # Read this frame's input once
+        inputs = self.input.poll().merge(self.pending_input)
+        ticks = 0
+        while self.accumulator >= TICK_DT and ticks < MAX_CATCHUP_TICKS:
+            self.tick(inputs)
+            # Clicks and key presses only count for the first tick
+            inputs = inputs.held()
+            self.accumulator -= TICK_DT
+            ticks += 1
+        # Too far behind: drop the backlog (skip frames, keep the game speed)
+        if self.accumulator >= TICK_DT:
+            self.accumulator %= TICK_DT
+        # Presses seen before any tick was due are kept for the next one
+        self.pending_input = inputs if ticks == 0 else None
+        self.alpha = self.accumulator / TICK_DT
+
+    def tick(self, inputs: FrameInput):
+        """Advance the simulation by one fixed timestep"""
+        # Remember where everything was, so draw() can interpolate towards this tick
+        self.player.prev_x = self.player.x
+        for bullet in self.bullets:
+            bullet.prev_x, bullet.prev_y = bullet.x, bullet.y
+        self.formation.prev_origin_x = self.formation.origin_x
+        self.formation.prev_origin_y = self.formation.origin_y
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+
         # Press Q key to exit the game (close window)
-        if pyxel.btnp(pyxel.KEY_Q):
-            pyxel.quit()
+        if inputs.quit:
+            self.quit_requested = True
+            self.profiler.close()
+            if self.recorder is not None:
+                self.recorder.save()
+            if not self.headless:
+                pyxel.quit()
+            return
 
         if self.game_over:
             # During game over, press R key to restart
-            if pyxel.btnp(pyxel.KEY_R):
+            if inputs.restart:
                 self.reset_game()
             return
 
+        self.profiler.start()
         # Update player position (following the mouse)
-        self.player.update()
+        self.player.update(inputs.mouse_x)
+        self.profiler.lap("player")
 
         # Bullet firing process (when left mouse button is pressed)
-        if pyxel.btnp(pyxel.MOUSE_BUTTON_LEFT):
-            if self.bullet is None or not self.bullet.active:
-                # Fire a new bullet from the player spaceship
+        if inputs.fire:
+            spread = self.fire_mode["spread"]
+            # Fire only if the whole volley fits under the bullet cap
+            if len(self.bullets) + len(spread) <= self.fire_mode["max_bullets"]:
+                # Fire new bullets from the player spaceship
                 bullet_x = self.player.x + (self.player.w // 2) - (BULLET_WIDTH // 2)
                 bullet_y = self.player.y - BULLET_HEIGHT
-                self.bullet = Bullet(bullet_x, bullet_y)
+                for vx in spread:
+                    self.bullets.spawn(bullet_x, bullet_y, vx)
                 # Play firing sound (on channel 0)
-                pyxel.play(0, 0)
+                self.play_sound(0, 0)
 
-        # Update existing bullet if it exists
-        if self.bullet is not None and self.bullet.active:
-            self.bullet.update()
-            # If bullet becomes inactive (reaches off-screen), delete the object
-            if not self.bullet.active:
-                self.bullet = None
+        # Update existing bullets
+        for bullet in self.bullets:
+            bullet.update()
+        self.profiler.lap("bullets")
 
         # Enemy movement process
-        if len(self.enemies) > 0:
+        if len(self.formation) > 0:
             # Check if reaching the edge of the screen
             # Calculate the leftmost and rightmost of the current enemy cluster
-            min_x = min(enemy.x for enemy in self.enemies)
-            max_x = max(enemy.x for enemy in self.enemies) + ENEMY_WIDTH
+            min_x, max_x = self.formation.bounds()
             # If moving right and the rightmost enemy reaches the right edge of the screen
-            if self.enemy_direction == 1 and max_x >= pyxel.width:
+            if self.enemy_direction == 1 and max_x >= SCREEN_WIDTH:
                 # Move all enemies down and reverse direction
-                for enemy in self.enemies:
-                    enemy.y += ENEMY_DROP
+                self.formation.drop(self.wave["drop"])
                 self.enemy_direction = -1
             # If moving left and the leftmost enemy reaches the left edge of the screen
             elif self.enemy_direction == -1 and min_x <= 0:
-                for enemy in self.enemies:
-                    enemy.y += ENEMY_DROP
+                self.formation.drop(self.wave["drop"])
                 self.enemy_direction = 1
             else:
                 # Normally move horizontally in the current direction
-                for enemy in self.enemies:
-                    enemy.x += ENEMY_X_SPEED * self.enemy_direction
-
-        # Collision detection between bullet and enemies
-        if self.bullet is not None:
-            for enemy in list(self.enemies):  # Loop using a copy of the list
-                if (self.bullet is not None and 
-                    enemy.alive and 
-                    # Rectangle collision detection (bullet and enemy)
-                    self.bullet.x < enemy.x + enemy.w and 
-                    self.bullet.x + self.bullet.w > enemy.x and 
-                    self.bullet.y < enemy.y + enemy.h and 
-                    self.bullet.y + self.bullet.h > enemy.y):
-                    # If collision occurs
-                    enemy.alive = False
-                    self.enemies.remove(enemy)  # Remove enemy from the list
-                    self.bullet.active = False  # Remove bullet
-                    self.bullet = None
-                    self.score += 1
-                    # Play explosion sound (on channel 1)
-                    pyxel.play(1, 1)
-                    break  # Prevent multiple enemies from being destroyed by a single bullet
+                self.formation.step(self.enemy_speed * self.enemy_direction)
+        self.profiler.lap("march")
+
+        # Collision detection between bullets and enemies
+        for bullet in self.bullets:
+            if not bullet.active:
+                continue
+            # Rectangle collision detection against the enemies in the cells the bullet overlaps
+            hit = self.formation.hit_test(bullet.x, bullet.y, bullet.w, bullet.h)
+            if hit >= 0:
+                # If collision occurs (one bullet destroys only one enemy)
+                self.formation.kill(hit)
+                bullet.active = False  # Remove bullet
+                self.score += 1
+                # The wave's speed curve may speed up the survivors
+                self.enemy_speed = wave_speed(self.wave, len(self.formation) / self.formation.total)
+                # Play explosion sound (on channel 1)
+                self.play_sound(1, 1)
+        # Drop bullets that went off-screen or hit an enemy
+        self.bullets.release_inactive()
+        self.profiler.lap("collision")
 
         # Game over/victory detection
         if not self.game_over:
             # Have enemies reached the bottom of the screen (player's Y coordinate)?
-            for enemy in self.enemies:
-                if enemy.y + enemy.h >= self.player.y:
-                    # Enemies have invaded the player line => Game Over (defeat)
-                    self.game_over = True
-                    self.win = False
-                    # Stop BGM and play game over sound
-                    pyxel.stop()
-                    pyxel.play(2, 2)  # Play game over sound on channel 2
-                    break
-            # Have all enemies been defeated?
-            if not self.game_over and len(self.enemies) == 0:
+            if len(self.formation) > 0 and self.formation.bottom() >= self.player.y:
+                # Enemies have invaded the player line => Game Over (defeat)
+                self.game_over = True
+                self.win = False
+                # Stop BGM and play game over sound
+                self.stop_sound()
+                self.play_sound(2, 2)  # Play game over sound on channel 2
+            # Wave cleared => next wave, if any
+            if (not self.game_over and len(self.formation) == 0
+                    and self.wave_index + 1 < len(self.waves)):
+                self.start_wave(self.wave_index + 1)
+            # Have all enemies of the last wave been defeated?
+            if not self.game_over and len(self.formation) == 0:
                 # All enemies defeated => Player victory
                 self.game_over = True
                 self.win = True
-                pyxel.stop()
-                pyxel.play(2, 4)  # Play victory sound (short fanfare) on channel 2
+                self.stop_sound()
+                self.play_sound(2, 4)  # Play victory sound (short fanfare) on channel 2
+        self.profiler.lap("win_lose")
 
     def draw(self):
+        self.profiler.start()
         # Clear background to black
         pyxel.cls(0)
+        self.profiler.lap("draw_clear")
 
         # Draw all objects
-        self.player.draw()
-        if self.bullet is not None and self.bullet.active:
-            self.bullet.draw()
-        for enemy in self.enemies:
-            if enemy.alive:
-                enemy.draw()
+        self.player.draw(self.alpha)
+        self.profiler.lap("draw_player")
+        for bullet in self.bullets:
+            bullet.draw(self.alpha)
+        self.profiler.lap("draw_bullets")
+        self.formation.draw(self.alpha)
+        self.profiler.lap("draw_enemies")
 
         # Display score (white text)
         pyxel.text(5, 5, f"SCORE: {self.score}", 7)
+        pyxel.text(SCREEN_WIDTH - 45, 5, f"WAVE {self.wave_index + 1}/{len(self.waves)}", 7)
 
         # Display message during game over
         if self.game_over:
@@ -265,7 +750,175 @@ class Game:
             pyxel.text(x, y, msg, color)
             # Restart instructions
             pyxel.text(x - 20, y + 10, "Press R to Restart", 7)
+        self.profiler.lap("draw_hud")
+
+        # Profiler overlay (below the score)
+        self.profiler.draw_overlay(2, 14)
+
+def run_headless(n_frames: int, fire_mode: str = "single", recorder: InputRecorder = None,
+                 waves=None):
+    """Run the simulation without a window and report its throughput"""
+    game = Game(headless=True, fire_mode=fire_mode, recorder=recorder, waves=waves)
+    start = time.perf_counter()
+    frames = game.step(n_frames)
+    elapsed = time.perf_counter() - start
+    fps = frames / elapsed if elapsed > 0 else float("inf")
+    print(f"{frames} frames in {elapsed:.3f} s ({fps:,.0f} frames/sec)")
+    game.profiler.close()
+    if recorder is not None:
+        recorder.save()
+    return fps
+
+def run_alloc_benchmark(n_frames: int, fire_mode: str = "rapid"):
+    """Measure entity memory and allocations during rapid fire with tracemalloc"""
+    # Plain (dict-backed) class with the same attributes as Bullet, for comparison
+    class DictBullet:
+        def __init__(self):
+            for name in Bullet.__slots__:
+                setattr(self, name, 0)
+
+    count = 10000
+    for label, factory in (("dict-backed", DictBullet), ("Bullet (__slots__)", Bullet)):
+        tracemalloc.start()
+        objects = [factory() for _ in range(count)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del objects
+        print(f"{label:<20} {size / count:6.1f} bytes per instance")
+
+    # Allocations while firing continuously (the pool is created before tracing starts)
+    game = Game(headless=True, input_provider=ScriptedInput(fire_every=1), fire_mode=fire_mode)
+    game.step(100)  # Warm up
+    gen0 = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    game.step(n_frames)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = gc.get_stats()[0]["collections"] - gen0
+    print(f"{n_frames} frames of {fire_mode} fire: peak {peak / 1024:.1f} KiB traced, "
+          f"{current / 1024:.1f} KiB still allocated, {collections} gen-0 GC runs")
+
+STRESS_SIZES = [15, 100, 1000, 5000, 10000, 25000, 50000]
+STRESS_GAP   = 2  # Smallest gap between neighbouring enemies (pixels)
+
+def stress_wave(n_enemies: int):
+    """A wave of at least n_enemies that never drops
+    It fills the upper half of the screen. Enemies never overlap: when they do
+    not fit there at STRESS_GAP pixels apart, the rows extend above the top edge."""
+    area_w = SCREEN_WIDTH - 2 * ENEMY_WIDTH
+    area_h = SCREEN_HEIGHT // 2
+    min_spacing_x = ENEMY_WIDTH + STRESS_GAP
+    min_spacing_y = ENEMY_HEIGHT + STRESS_GAP
+    cols = max(1, min(math.ceil(math.sqrt(n_enemies * area_w / area_h)), area_w // min_spacing_x))
+    rows = math.ceil(n_enemies / cols)
+    spacing_x = max(min_spacing_x, area_w // cols)
+    spacing_y = max(min_spacing_y, area_h // rows)
+    start_y = min(20, 20 + area_h - rows * spacing_y)  # Bottom row stays in the upper half
+    return {**DEFAULT_WAVE, "cols": cols, "rows": rows, "start_x": ENEMY_WIDTH, "start_y": start_y,
+            "spacing_x": spacing_x, "spacing_y": spacing_y, "drop": 0}
+
+def run_stress(sizes, n_frames: int = 600, csv_path: str = "stress.csv"):
+    """Sweep formation sizes headless and report frame time against entity count"""
+    results = []
+    for n in sizes:
+        wave = stress_wave(n)
+        game = Game(headless=True, input_provider=ScriptedInput(fire_every=2),
+                    fire_mode="rapid", waves=[wave])
+        game.step(60)  # Warm up
+        samples = []
+        for _ in range(n_frames):
+            start = time.perf_counter()
+            game.step(1)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        mean = sum(samples) / len(samples)
+        p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+        results.append((wave["cols"] * wave["rows"], mean, p95))
+
+    # Table with a text bar chart of the mean frame time
+    longest = max(mean for _, mean, _ in results) or 1
+    print(f"{'enemies':>8} {'mean ms':>9} {'p95 ms':>9}")
+    for count, mean, p95 in results:
+        print(f"{count:>8} {mean:9.4f} {p95:9.4f} {'#' * max(1, round(40 * mean / longest))}")
+
+    with open(csv_path, "w") as f:
+        f.write("enemies,mean_ms,p95_ms\n")
+        for count, mean, p95 in results:
+            f.write(f"{count},{mean:.5f},{p95:.5f}\n")
+    print(f"Results written to {csv_path}")
+
+    # Plot if matplotlib is available (optional)
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return results
+    counts = [count for count, _, _ in results]
+    plt.plot(counts, [mean for _, mean, _ in results], marker="o", label="mean")
+    plt.plot(counts, [p95 for _, _, p95 in results], marker="o", label="p95")
+    plt.xscale("log")
+    plt.xlabel("enemies")
+    plt.ylabel("frame time (ms)")
+    plt.legend()
+    png_path = os.path.splitext(csv_path)[0] + ".png"
+    plt.savefig(png_path)
+    print(f"Plot written to {png_path}")
+    return results
+
+def run_replay(path: str, waves=None):
+    """Replay an input log headless at full speed and report the outcome"""
+    replay = ReplayInput(path)
+    if waves is None:
+        waves = load_waves()
+    if replay.waves_digest != waves_digest(waves):
+        raise ValueError(f"{path} was recorded with other waves (see --waves)")
+    game = Game(headless=True, input_provider=replay, fire_mode=replay.fire_mode, waves=waves)
+    start = time.perf_counter()
+    frames = 0
+    while not game.quit_requested:
+        frames += game.step(10000)
+    elapsed = time.perf_counter() - start
+    fps = frames / elapsed if elapsed > 0 else float("inf")
+    # The outcome lets two versions of the game be compared on the same session
+    result = "win" if game.win else "lose" if game.game_over else "playing"
+    print(f"{frames} frames in {elapsed:.3f} s ({fps:,.0f} frames/sec)")
+    print(f"score={game.score} enemies_left={len(game.formation)} result={result}")
+    game.profiler.close()
+    return fps
 
 # Start the game (main entry point)
 if __name__ == "__main__":
-    Game()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Space Invader (Pyxel)")
+    parser.add_argument("--headless", type=int, metavar="FRAMES",
+                        help="run FRAMES updates without a window and report frames/sec")
+    parser.add_argument("--fire-mode", choices=sorted(FIRE_MODES), default="single",
+                        help="bullet cap and firing pattern (default: single)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the input of every frame to PATH")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a recorded session headless at full speed")
+    parser.add_argument("--bench-alloc", type=int, metavar="FRAMES",
+                        help="measure entity memory and allocations over FRAMES of rapid fire")
+    parser.add_argument("--waves", metavar="PATH", default=WAVES_PATH,
+                        help="JSON file with the enemy waves (default: assets/waves.json)")
+    parser.add_argument("--stress", type=int, nargs="*", metavar="N",
+                        help="sweep formation sizes headless (default sizes: "
+                             + " ".join(map(str, STRESS_SIZES)) + ") and write stress.csv")
+    # parse_known_args: `pyxel run` leaves its own arguments in sys.argv
+    args, _ = parser.parse_known_args()
+    waves = load_waves(args.waves)
+    recorder = InputRecorder(args.record, args.fire_mode, waves) if args.record else None
+    if args.stress is not None:
+        run_stress(args.stress or STRESS_SIZES)
+    elif args.bench_alloc:
+        run_alloc_benchmark(args.bench_alloc)
+    elif args.replay:
+        run_replay(args.replay, waves)
+    elif args.headless:
+        run_headless(args.headless, args.fire_mode, recorder, waves)
+    else:
+        if recorder is not None:
+            # Also save when the window is closed instead of quitting with Q
+            atexit.register(recorder.save)
+        Game(fire_mode=args.fire_mode, recorder=recorder, waves=waves)
\ No newline at end of file